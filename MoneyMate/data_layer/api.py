@@ -36,6 +36,8 @@ def get_db():
                     _db = DatabaseManager()
                 except TypeError:
                     _db = DatabaseManager()  # legacy fallback
+    if hasattr(_db, "maybe_optimize"):
+        _db.maybe_optimize()
     return _db
 
 def set_db_path(db_path):
@@ -266,4 +268,4 @@ def api_get_user_balance_breakdown(user_id):
 
 def api_get_contact_balance(user_id, contact_id):
     logger.info(f"API call: api_get_contact_balance (user_id={user_id}, contact_id={contact_id})")
-    return get_db().transactions.get_contact_balance(user_id, contact_id)
\ No newline at end of file
+    return get_db().transactions.get_contact_balance(user_id, contact_id)
@@ -11,8 +11,7 @@ This module defines CategoriesManager, a small ORM-like helper responsible for:
 It directly uses the shared SQLite connection helpers from database.py.
 """
 
-from .database import get_connection
-from .database import get_connection
+from .database import get_managed_connection
 from .manager import DatabaseManager # Ensure global logging configuration
 
 from .logging_config import get_logger
@@ -48,7 +47,7 @@ class CategoriesManager:
         if not name_norm:
             return self.dict_response(False, "Category name required")
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cur = conn.cursor()
                 cur.execute(
                     "INSERT INTO categories (user_id, name, description, color, icon) VALUES (?, ?, ?, ?, ?)",
@@ -69,7 +68,7 @@ class CategoriesManager:
         Supports optional ordering and pagination.
         """
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cur = conn.cursor()
                 sql = f"SELECT id, name, description, color, icon FROM categories WHERE user_id = ? {_order_clause(order)}"
                 params = [user_id]
@@ -100,7 +99,7 @@ class CategoriesManager:
         Idempotent semantics: always return success with deleted count.
         """
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cur = conn.cursor()
                 cur.execute("DELETE FROM categories WHERE id = ? AND user_id = ?", (category_id, user_id))
                 deleted = cur.rowcount or 0
@@ -119,11 +118,11 @@ class CategoriesManager:
         Helper for cross-entity validation: check if category belongs to user.
         """
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cur = conn.cursor()
                 cur.execute("SELECT 1 FROM categories WHERE id = ? AND user_id = ?", (category_id, user_id))
                 return cur.fetchone() is not None
         except Exception as e:
             logger.error(f"Error checking category existence id={category_id} for user {user_id}: {e}")
 
-            return False
\ No newline at end of file
+            return False
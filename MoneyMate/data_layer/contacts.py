@@ -15,7 +15,7 @@ DatabaseManager and the GUI API layer.
 
 import sqlite3
 from typing import Any, Optional, Dict
-from .database import get_connection
+from .database import get_managed_connection
 from .validation import validate_contact
 from .logging_config import get_logger
 
@@ -52,7 +52,7 @@ class ContactsManager:
             logger.warning(f"Validation failed for contact '{name}': {err}")
             return dict_response(False, err)
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute(
@@ -71,7 +71,7 @@ class ContactsManager:
 
     def get_contacts(self, user_id, order="name_asc"):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 sql = f"SELECT id, name FROM contacts WHERE user_id = ? {_order_clause(order)}"
@@ -86,7 +86,7 @@ class ContactsManager:
 
     def delete_contact(self, contact_id, user_id):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute(
@@ -106,7 +106,7 @@ class ContactsManager:
 
     def contact_exists(self, contact_id, user_id):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute(
@@ -13,45 +13,365 @@ This module is the central place for:
 It is used by DatabaseManager and by higher-level modules that need a DB path.
 """
 
+import contextlib
+import queue
 import sqlite3
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 
 # Default database path used by DatabaseManager when no path is provided.
 DB_PATH = "moneymate.db"
 
 # Simple schema versioning scaffold
-SCHEMA_VERSION = 2  # v2: tightened CHECKS, migration scaffold
+SCHEMA_VERSION = 4  # v4: transaction indexes matching get_transactions filters/orderings
+
+# Tuned PRAGMAs applied by init_db. journal_mode=WAL persists in the DB header,
+# so every later connection to a file DB inherits it.
+_WAL_PRAGMA = "PRAGMA journal_mode = WAL;"
+_INIT_PRAGMAS = """
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA cache_size = -16000;
+    PRAGMA busy_timeout = 5000;
+    PRAGMA foreign_keys = ON;
+"""
+
+# Per-connection settings for short-lived get_connection() handles. WAL itself is
+# persistent (set by init_db); these are not, so every connection applies them.
+# cache_size/mmap_size are left to the long-lived handles (_INIT_PRAGMAS): a
+# short-lived connection drops its page cache on close, so a bigger one buys nothing.
+_CONN_PRAGMAS = (
+    "PRAGMA foreign_keys = ON;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA busy_timeout = 5000;",
+)
+
+# Prepared-statement cache for long-lived connections (stdlib default: 128).
+_STMT_CACHE_SIZE = 256
+
+def _is_memory_path(db_path: str) -> bool:
+    return db_path == ":memory:" or (isinstance(db_path, str) and "mode=memory" in db_path)
+
+def _connect(db_path: str, cached_statements: int = _STMT_CACHE_SIZE) -> sqlite3.Connection:
+    """
+    Open a long-lived connection configured like init_db: WAL (file DBs only)
+    plus the tuned PRAGMAs. Single call site for keeper, ops and pooled handles.
+    """
+    use_uri = isinstance(db_path, str) and db_path.startswith("file:")
+    conn = sqlite3.connect(
+        db_path, uri=use_uri, check_same_thread=False, cached_statements=cached_statements
+    )
+    if not _is_memory_path(db_path):
+        conn.execute(_WAL_PRAGMA)
+    conn.executescript(_INIT_PRAGMAS)
+    return conn
+
+def _apply_conn_pragmas(conn: sqlite3.Connection) -> None:
+    """
+    Apply _CONN_PRAGMAS one statement at a time: unlike executescript() this
+    never commits a transaction the caller already has open.
+    """
+    for pragma in _CONN_PRAGMAS:
+        conn.execute(pragma)
 
 def get_connection(db_path: str) -> sqlite3.Connection:
     """
-    Return a new SQLite connection with foreign key support enabled.
+    Return a new SQLite connection with foreign keys enforced, NORMAL sync,
+    in-memory temp storage and a busy timeout.
     """
     if isinstance(db_path, str) and db_path.startswith("file:"):
         conn = sqlite3.connect(db_path, uri=True)
     else:
         conn = sqlite3.connect(db_path)
-    conn.execute("PRAGMA foreign_keys = ON;")
+    _apply_conn_pragmas(conn)
     conn.row_factory = sqlite3.Row
     return conn
 
-def _get_current_version(cur: sqlite3.Cursor) -> Optional[int]:
-    cur.execute("SELECT COUNT(*) AS cnt FROM sqlite_schema WHERE type='table' AND name='schema_version';")
-    exists = cur.fetchone()["cnt"] > 0
+@contextlib.contextmanager
+def _closing_connection(db_path: str) -> Iterator[sqlite3.Connection]:
+    """
+    get_connection() for internal one-shot use: commits (or rolls back) like
+    `with conn:` and then closes the handle. A plain sqlite3 connection only
+    ends the transaction on exit, and its statement cache keeps a reference
+    cycle alive, so it would linger (holding WAL/SHM files) until the next gc.
+    """
+    conn = get_connection(db_path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def _close_optimized(conn: sqlite3.Connection) -> None:
+    """
+    Close a long-lived connection, first letting SQLite refresh planner stats
+    for what it ran (PRAGMA optimize is close to free when nothing is stale).
+    """
+    try:
+        conn.execute("PRAGMA optimize;")
+    except Exception:
+        pass
+    conn.close()
+
+class _PooledLease:
+    """
+    Context manager handed out by ConnectionPool.connection(): commits (or rolls
+    back) like a sqlite3 connection would, then returns it to the pool.
+    """
+
+    __slots__ = ("_pool", "_conn")
+
+    def __init__(self, pool: "ConnectionPool"):
+        self._pool = pool
+        self._conn = pool.acquire()
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.__exit__(exc_type, exc, tb)
+        finally:
+            self._pool.release(self._conn)
+        return False
+
+class ConnectionPool:
+    """
+    Small thread-safe pool of configured connections to a single database.
+
+    Connections are opened lazily (up to `size` are kept idle), carry the
+    tuned PRAGMAs and sqlite3.Row rows, and are closed by close(). SQLite
+    serializes writers itself, so pooled handles serve both reads and writes.
+    """
+
+    def __init__(self, db_path: str, size: int = 4):
+        self.db_path = db_path
+        self.size = size
+        self._idle: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = _connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if self._closed or self._idle.qsize() >= self.size:
+            _close_optimized(conn)
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = sqlite3.Row
+        self._idle.put(conn)
+
+    def connection(self) -> _PooledLease:
+        """Use as `with pool.connection() as conn:`."""
+        return _PooledLease(self)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                _close_optimized(conn)
+            except Exception:
+                pass
+
+def get_managed_connection(db_path: str, db_manager=None):
+    """
+    Return a `with`-able connection: pooled from db_manager when it has a live
+    pool, otherwise a fresh get_connection(db_path) closed on exit.
+    """
+    if db_manager is not None:
+        pool = getattr(db_manager, "_pool", None)
+        if pool is not None:
+            return pool.connection()
+    return _closing_connection(db_path)
+
+# Full schema, run by init_db in one executescript inside a single transaction.
+_SCHEMA_SQL = """
+    -- Schema version table
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER NOT NULL
+    );
+
+    -- Users
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'user' CHECK (role IN ('user','admin')),
+        created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+
+    -- Contacts
+    CREATE TABLE IF NOT EXISTS contacts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        UNIQUE (user_id, name),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_contacts_user_id ON contacts(user_id);
+
+    -- Expenses
+    CREATE TABLE IF NOT EXISTS expenses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        price REAL NOT NULL CHECK (price > 0),
+        date TEXT NOT NULL,
+        category TEXT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        category_id INTEGER,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_expenses_user_id ON expenses(user_id);
+    CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date);
+    CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses(user_id, date);
+    CREATE INDEX IF NOT EXISTS idx_expenses_category_id ON expenses(category_id);
+
+    -- Transactions
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        from_user_id INTEGER NOT NULL,
+        to_user_id INTEGER NOT NULL,
+        type TEXT NOT NULL CHECK (type IN ('credit','debit')),
+        amount REAL NOT NULL CHECK (amount > 0),
+        date TEXT NOT NULL,
+        description TEXT,
+        contact_id INTEGER,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        CHECK (from_user_id <> to_user_id),
+        FOREIGN KEY (from_user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (to_user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (contact_id) REFERENCES contacts(id) ON DELETE SET NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_transactions_from_user ON transactions(from_user_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_to_user ON transactions(to_user_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_from_user_date ON transactions(from_user_id, date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_to_user_date ON transactions(to_user_id, date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_contact_id ON transactions(contact_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_from_user_contact ON transactions(from_user_id, contact_id, date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_from_user_created ON transactions(from_user_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_transactions_to_user_created ON transactions(to_user_id, created_at);
+
+    -- Categories
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT,
+        color TEXT,
+        icon TEXT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        UNIQUE (user_id, name),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_categories_user_id ON categories(user_id);
+
+    -- Notes
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        expense_id INTEGER,
+        transaction_id INTEGER,
+        contact_id INTEGER,
+        content TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (expense_id) REFERENCES expenses(id) ON DELETE CASCADE,
+        FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE,
+        FOREIGN KEY (contact_id) REFERENCES contacts(id) ON DELETE CASCADE,
+        CHECK (expense_id IS NOT NULL OR transaction_id IS NOT NULL OR contact_id IS NOT NULL)
+    );
+    CREATE INDEX IF NOT EXISTS idx_notes_user_id ON notes(user_id);
+    CREATE INDEX IF NOT EXISTS idx_notes_expense_id ON notes(expense_id);
+    CREATE INDEX IF NOT EXISTS idx_notes_transaction_id ON notes(transaction_id);
+    CREATE INDEX IF NOT EXISTS idx_notes_contact_id ON notes(contact_id);
+
+    -- Attachments
+    CREATE TABLE IF NOT EXISTS attachments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        expense_id INTEGER,
+        transaction_id INTEGER,
+        contact_id INTEGER,
+        file_path TEXT NOT NULL,
+        mime_type TEXT,
+        size_bytes INTEGER,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (expense_id) REFERENCES expenses(id) ON DELETE CASCADE,
+        FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE,
+        FOREIGN KEY (contact_id) REFERENCES contacts(id) ON DELETE CASCADE,
+        CHECK (expense_id IS NOT NULL OR transaction_id IS NOT NULL OR contact_id IS NOT NULL)
+    );
+    CREATE INDEX IF NOT EXISTS idx_attachments_user_id ON attachments(user_id);
+    CREATE INDEX IF NOT EXISTS idx_attachments_expense_id ON attachments(expense_id);
+    CREATE INDEX IF NOT EXISTS idx_attachments_transaction_id ON attachments(transaction_id);
+    CREATE INDEX IF NOT EXISTS idx_attachments_contact_id ON attachments(contact_id);
+
+    -- Access logs
+    CREATE TABLE IF NOT EXISTS access_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        action TEXT NOT NULL CHECK (action IN (
+            'login','logout','failed_login','password_change','password_reset'
+        )),
+        ip_address TEXT,
+        user_agent TEXT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_access_logs_user_id ON access_logs(user_id);
+    CREATE INDEX IF NOT EXISTS idx_access_logs_action ON access_logs(action);
+    CREATE INDEX IF NOT EXISTS idx_access_logs_created_at ON access_logs(created_at);
+    CREATE INDEX IF NOT EXISTS idx_access_logs_user_created ON access_logs(user_id, created_at);
+"""
+
+def _get_current_version(conn: sqlite3.Connection) -> Optional[int]:
+    exists = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_schema WHERE type='table' AND name='schema_version';"
+    ).fetchone()[0] > 0
     if not exists:
         return None
-    cur.execute("SELECT version FROM schema_version LIMIT 1;")
-    row = cur.fetchone()
-    return int(row["version"]) if row else None
+    row = conn.execute("SELECT version FROM schema_version LIMIT 1;").fetchone()
+    return int(row[0]) if row else None
 
-def _set_version(cur: sqlite3.Cursor, version: int) -> None:
-    cur.execute("DELETE FROM schema_version;")
-    cur.execute("INSERT INTO schema_version (version) VALUES (?);", (version,))
+def _set_version(conn: sqlite3.Connection, version: int) -> None:
+    conn.execute("DELETE FROM schema_version;")
+    conn.execute("INSERT INTO schema_version (version) VALUES (?);", (version,))
 
-def _migrate(cur: sqlite3.Cursor, from_version: int, to_version: int) -> None:
+def _migrate(conn: sqlite3.Connection, from_version: int, to_version: int) -> None:
     """
     Non-destructive migration scaffold.
     """
-    _set_version(cur, to_version)
+    if from_version < 4:
+        # v3 indexed (from_user_id, contact_id) only; the trailing date lets contact-filtered
+        # listings use the index for both the date range and the ORDER BY. Rebuild it only
+        # when the stored definition lacks the date column (a v4 index is left alone).
+        row = conn.execute(
+            "SELECT sql FROM sqlite_schema WHERE type='index' AND name='idx_transactions_from_user_contact';"
+        ).fetchone()
+        if row is None or "date" not in (row[0] or "").lower():
+            conn.execute("DROP INDEX IF EXISTS idx_transactions_from_user_contact;")
+            conn.execute(
+                "CREATE INDEX idx_transactions_from_user_contact ON transactions(from_user_id, contact_id, date);"
+            )
+    _set_version(conn, to_version)
 
 def init_db(db_path: str) -> Dict[str, Any]:
     """
@@ -59,212 +379,81 @@ def init_db(db_path: str) -> Dict[str, Any]:
     """
     try:
         conn = get_connection(db_path)
-        cur = conn.cursor()
-
-        # Schema version table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS schema_version (
-                version INTEGER NOT NULL
-            );
-        """)
-        current_version = _get_current_version(cur)
-        if current_version is None:
-            _set_version(cur, SCHEMA_VERSION)
-
-        # Users
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL UNIQUE,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL DEFAULT 'user' CHECK (role IN ('user','admin')),
-                created_at TEXT NOT NULL DEFAULT (datetime('now'))
-            );
-        """)
-
-        # Contacts
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS contacts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                UNIQUE (user_id, name),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            );
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_contacts_user_id ON contacts(user_id);")
-
-        # Expenses
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS expenses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                price REAL NOT NULL CHECK (price > 0),
-                date TEXT NOT NULL,
-                category TEXT,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                category_id INTEGER,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            );
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_expenses_user_id ON expenses(user_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses(user_id, date);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_expenses_category_id ON expenses(category_id);")
-
-        # Transactions
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_user_id INTEGER NOT NULL,
-                to_user_id INTEGER NOT NULL,
-                type TEXT NOT NULL CHECK (type IN ('credit','debit')),
-                amount REAL NOT NULL CHECK (amount > 0),
-                date TEXT NOT NULL,
-                description TEXT,
-                contact_id INTEGER,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                CHECK (from_user_id <> to_user_id),
-                FOREIGN KEY (from_user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (to_user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (contact_id) REFERENCES contacts(id) ON DELETE SET NULL
-            );
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_transactions_from_user ON transactions(from_user_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_transactions_to_user ON transactions(to_user_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_transactions_from_user_date ON transactions(from_user_id, date);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_transactions_to_user_date ON transactions(to_user_id, date);")
-
-        # Categories
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                description TEXT,
-                color TEXT,
-                icon TEXT,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                UNIQUE (user_id, name),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            );
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_categories_user_id ON categories(user_id);")
-
-        # Notes
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                expense_id INTEGER,
-                transaction_id INTEGER,
-                contact_id INTEGER,
-                content TEXT NOT NULL,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (expense_id) REFERENCES expenses(id) ON DELETE CASCADE,
-                FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE,
-                FOREIGN KEY (contact_id) REFERENCES contacts(id) ON DELETE CASCADE,
-                CHECK (expense_id IS NOT NULL OR transaction_id IS NOT NULL OR contact_id IS NOT NULL)
-            );
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_notes_user_id ON notes(user_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_notes_expense_id ON notes(expense_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_notes_transaction_id ON notes(transaction_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_notes_contact_id ON notes(contact_id);")
-
-        # Attachments
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS attachments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                expense_id INTEGER,
-                transaction_id INTEGER,
-                contact_id INTEGER,
-                file_path TEXT NOT NULL,
-                mime_type TEXT,
-                size_bytes INTEGER,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (expense_id) REFERENCES expenses(id) ON DELETE CASCADE,
-                FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE,
-                FOREIGN KEY (contact_id) REFERENCES contacts(id) ON DELETE CASCADE,
-                CHECK (expense_id IS NOT NULL OR transaction_id IS NOT NULL OR contact_id IS NOT NULL)
-            );
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_attachments_user_id ON attachments(user_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_attachments_expense_id ON attachments(expense_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_attachments_transaction_id ON attachments(transaction_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_attachments_contact_id ON attachments(contact_id);")
-
-        # Access logs
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS access_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                action TEXT NOT NULL CHECK (action IN (
-                    'login','logout','failed_login','password_change','password_reset'
-                )),
-                ip_address TEXT,
-                user_agent TEXT,
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
-            );
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_access_logs_user_id ON access_logs(user_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_access_logs_action ON access_logs(action);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_access_logs_created_at ON access_logs(created_at);")
+        # Only DDL and PRAGMAs run here: plain tuples, no sqlite3.Row objects.
+        conn.row_factory = None
+        # Fast path: user_version is only stamped after a complete init at this version.
+        if conn.execute("PRAGMA user_version;").fetchone()[0] == SCHEMA_VERSION:
+            return {"success": True, "error": None, "data": "initialized"}
+        # WAL is ignored for in-memory databases; the remaining PRAGMAs still apply.
+        if not _is_memory_path(db_path):
+            conn.execute(_WAL_PRAGMA)
+        conn.executescript(_INIT_PRAGMAS)
+        # One script, one transaction: tables + indexes (migrations below join it).
+        # IMMEDIATE takes the write lock up front, so concurrent inits wait on
+        # busy_timeout instead of failing on a read->write lock upgrade.
+        conn.executescript("BEGIN IMMEDIATE;" + _SCHEMA_SQL)
 
         # --- NON-DESTRUCTIVE MIGRATIONS (before commit) ---
 
+        # Columns of every migrated table in one query instead of one PRAGMA per table
+        table_cols: Dict[str, set] = {}
+        for table, column in conn.execute(
+            "SELECT m.name, p.name FROM sqlite_schema AS m, pragma_table_info(m.name) AS p "
+            "WHERE m.type='table' AND m.name IN ('expenses','categories','transactions','users');"
+        ):
+            table_cols.setdefault(table, set()).add(column)
+
+        # A failed ALTER is tolerated, but then user_version stays unstamped so the
+        # next init_db retries the migrations instead of taking the fast path.
+        migrations_ok = True
+
         # Ensure expenses.category_id exists (old DBs)
         try:
-            cur.execute("PRAGMA table_info(expenses);")
-            expense_cols = {row["name"] for row in cur.fetchall()}
+            expense_cols = table_cols.get("expenses", set())
             if "category_id" not in expense_cols:
-                cur.execute("ALTER TABLE expenses ADD COLUMN category_id INTEGER;")
-                cur.execute("CREATE INDEX IF NOT EXISTS idx_expenses_category_id ON expenses(category_id);")
+                conn.execute("ALTER TABLE expenses ADD COLUMN category_id INTEGER;")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_category_id ON expenses(category_id);")
         except Exception:
-            pass
+            migrations_ok = False
 
         # Ensure categories.user_id exists (old DBs)
         try:
-            cur.execute("PRAGMA table_info(categories);")
-            cat_cols = {row["name"] for row in cur.fetchall()}
+            cat_cols = table_cols.get("categories", set())
             if "user_id" not in cat_cols:
-                cur.execute("ALTER TABLE categories ADD COLUMN user_id INTEGER;")
+                conn.execute("ALTER TABLE categories ADD COLUMN user_id INTEGER;")
         except Exception:
-            pass
+            migrations_ok = False
 
         # Ensure transactions.from_user_id / to_user_id exist (old DBs)
         try:
-            cur.execute("PRAGMA table_info(transactions);")
-            tx_cols = {row["name"] for row in cur.fetchall()}
+            tx_cols = table_cols.get("transactions", set())
             if "from_user_id" not in tx_cols:
-                cur.execute("ALTER TABLE transactions ADD COLUMN from_user_id INTEGER;")
+                conn.execute("ALTER TABLE transactions ADD COLUMN from_user_id INTEGER;")
             if "to_user_id" not in tx_cols:
-                cur.execute("ALTER TABLE transactions ADD COLUMN to_user_id INTEGER;")
+                conn.execute("ALTER TABLE transactions ADD COLUMN to_user_id INTEGER;")
         except Exception:
-            pass
+            migrations_ok = False
 
         # Ensure users.is_active exists (used by user manager)
         try:
-            cur.execute("PRAGMA table_info(users);")
-            usr_cols = {row["name"] for row in cur.fetchall()}
+            usr_cols = table_cols.get("users", set())
             if "is_active" not in usr_cols:
-                cur.execute("ALTER TABLE users ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1;")
+                conn.execute("ALTER TABLE users ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1;")
         except Exception:
-            pass
+            migrations_ok = False
 
-        # Bump schema version if needed
-        current_version = _get_current_version(cur)
-        if current_version is not None and current_version < SCHEMA_VERSION:
-            _migrate(cur, current_version, SCHEMA_VERSION)
+        # Record the version on fresh DBs, bump it if needed on older ones
+        current_version = _get_current_version(conn)
+        if current_version is None:
+            _set_version(conn, SCHEMA_VERSION)
+        elif current_version < SCHEMA_VERSION:
+            _migrate(conn, current_version, SCHEMA_VERSION)
 
+        if migrations_ok:
+            conn.execute(f"PRAGMA user_version = {int(SCHEMA_VERSION)};")
         conn.commit()
+        # Fresh tables/indexes: let SQLite gather planner stats while we hold the handle.
+        conn.execute("PRAGMA optimize;")
         return {"success": True, "error": None, "data": "initialized"}
     except Exception as e:
         return {"success": False, "error": str(e), "data": None}
@@ -277,10 +466,9 @@ def init_db(db_path: str) -> Dict[str, Any]:
 def get_schema_version(db_path: str) -> Dict[str, Any]:
     try:
         conn = get_connection(db_path)
-        cur = conn.cursor()
-        cur.execute("SELECT version FROM schema_version LIMIT 1;")
-        row = cur.fetchone()
-        version = int(row["version"]) if row else None
+        conn.row_factory = None
+        row = conn.execute("SELECT version FROM schema_version LIMIT 1;").fetchone()
+        version = int(row[0]) if row else None
         return {"success": True, "error": None, "data": version}
     except Exception as e:
         return {"success": False, "error": str(e), "data": None}
@@ -296,15 +484,13 @@ def list_tables(db_path: str) -> Dict[str, Any]:
     """
     try:
         conn = get_connection(db_path)
-        cur = conn.cursor()
-        cur.execute("""
+        conn.row_factory = None
+        tables = [r[0] for r in conn.execute("""
             SELECT name
             FROM sqlite_schema
             WHERE type='table' AND name NOT LIKE 'sqlite_%'
             ORDER BY name;
-        """)
-        rows = cur.fetchall()
-        tables = [r["name"] for r in rows]
+        """)]
         return {"success": True, "error": None, "data": tables}
     except Exception as e:
         return {"success": False, "error": str(e), "data": []}
@@ -312,4 +498,4 @@ def list_tables(db_path: str) -> Dict[str, Any]:
         try:
             conn.close()
         except Exception:
-            pass
\ No newline at end of file
+            pass
@@ -13,23 +13,25 @@ It focuses on data integrity and compatibility with evolving DB schemas.
 """
 
 import sqlite3
-from datetime import datetime
 from typing import Optional, Any, Dict
-from .database import get_connection
-from .validation import validate_expense
+from .database import get_managed_connection
+from .validation import validate_expense, is_valid_date
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+_ORDER_CLAUSES = {
+    "date_desc": "ORDER BY date DESC, id DESC",
+    "date_asc": "ORDER BY date ASC, id ASC",
+    "created_desc": "ORDER BY created_at DESC, id DESC",
+    "created_asc": "ORDER BY created_at ASC, id ASC",
+}
+_ORDER_DEFAULT = _ORDER_CLAUSES["date_desc"]
+
 def _order_clause(order: str) -> str:
-    mapping = {
-        "date_desc": "ORDER BY date DESC, id DESC",
-        "date_asc": "ORDER BY date ASC, id ASC",
-        "created_desc": "ORDER BY created_at DESC, id DESC",
-        "created_asc": "ORDER BY created_at ASC, id ASC",
-    }
-    return mapping.get((order or "date_desc"), mapping["date_desc"])
+    # Unknown/None/"" orders fall back to date_desc.
+    return _ORDER_CLAUSES.get(order, _ORDER_DEFAULT)
 
 
 def dict_response(success: bool, error: Optional[str] = None, data: Any = None) -> Dict[str, Any]:
@@ -81,12 +83,7 @@ class ExpensesManager:
             return dict_response(False, err)
 
         try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except Exception:
-            return dict_response(False, "Invalid date format (YYYY-MM-DD required)")
-
-        try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 include_category_fk = self._has_column(conn, "expenses", "category_id")
                 cursor = conn.cursor()
@@ -110,6 +107,36 @@ class ExpensesManager:
             logger.error(f"Error adding expense '{title}': {e}")
             return dict_response(False, str(e))
 
+    def add_expenses_bulk(self, items, user_id):
+        """
+        Add many expenses for one user in a single database transaction.
+        Each item is a dict with title/price/date/category (same rules as
+        add_expense). Invalid items are skipped and reported in data["errors"]
+        as {"index", "error"}.
+        """
+        rows, errors = [], []
+        for idx, item in enumerate(items or []):
+            title, price, date, category = item.get("title"), item.get("price"), item.get("date"), item.get("category")
+            err = validate_expense(title, price, date, category)
+            if err:
+                errors.append({"index": idx, "error": err})
+                continue
+            rows.append((title, float(price), date, category, user_id))
+
+        try:
+            if rows:
+                with get_managed_connection(self.db_path, self._db_manager) as conn:
+                    conn.executemany(
+                        "INSERT INTO expenses (title, price, date, category, user_id) VALUES (?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    conn.commit()
+            logger.info(f"Bulk added {len(rows)} expenses for user id={user_id} ({len(errors)} rejected)")
+            return dict_response(True, data={"inserted": len(rows), "errors": errors})
+        except Exception as e:
+            logger.error(f"Error adding expenses in bulk: {e}")
+            return dict_response(False, str(e))
+
     def update_expense(self, expense_id, user_id, title=None, price=None, date=None, category=None, category_id=None):
         fields = {}
 
@@ -129,9 +156,7 @@ class ExpensesManager:
             fields["price"] = price_val
 
         if date is not None:
-            try:
-                datetime.strptime(date, "%Y-%m-%d")
-            except Exception:
+            if not is_valid_date(date):
                 return dict_response(False, "Invalid date format (YYYY-MM-DD required)")
             fields["date"] = date
 
@@ -142,7 +167,7 @@ class ExpensesManager:
             fields["category"] = category_norm
 
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 include_category_fk = self._has_column(conn, "expenses", "category_id")
                 if category_id is not None:
@@ -168,7 +193,7 @@ class ExpensesManager:
 
     def get_expenses(self, user_id, order="date_desc", limit=None, offset=None, date_from=None, date_to=None):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 include_category_fk = self._has_column(conn, "expenses", "category_id")
                 select_cols = "id, title, price, date, category" + (", category_id" if include_category_fk else "")
@@ -200,7 +225,7 @@ class ExpensesManager:
 
     def search_expenses(self, query, user_id, order="date_desc", limit=None, offset=None, date_from=None, date_to=None):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 include_category_fk = self._has_column(conn, "expenses", "category_id")
                 select_cols = "id, title, price, date, category" + (", category_id" if include_category_fk else "")
@@ -232,7 +257,7 @@ class ExpensesManager:
 
     def delete_expense(self, expense_id, user_id):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM expenses WHERE id = ? AND user_id = ?", (expense_id, user_id))
@@ -247,7 +272,7 @@ class ExpensesManager:
 
     def clear_expenses(self, user_id):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM expenses WHERE user_id = ?", (user_id,))
@@ -257,4 +282,4 @@ class ExpensesManager:
             return dict_response(True, data={"deleted": deleted})
         except Exception as e:
             logger.error(f"Error clearing expenses for user {user_id}: {e}")
-            return dict_response(False, str(e))
\ No newline at end of file
+            return dict_response(False, str(e))
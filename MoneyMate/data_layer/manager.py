@@ -15,19 +15,62 @@ This class is the primary entry point for non-GUI code that wants a single
 object to talk to the MoneyMate data layer.
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set, Tuple
+import functools
 import sqlite3
 import sys
-import types
 import gc
+import itertools
+import threading
+import time
 import re
 import datetime
 
-from .database import DB_PATH, list_tables as db_list_tables, init_db as db_init_db
+from .database import DB_PATH, ConnectionPool, _connect, _is_memory_path, init_db as db_init_db
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Precompiled once: validators run on every legacy add_* call.
+_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})\Z", re.ASCII)
+_VALID_TTYPES = frozenset(("credit", "debit"))
+_INT_RE = re.compile(r"^-?\d+\Z", re.ASCII)
+_NUM_RE = re.compile(r"^-?\d+(\.\d+)?\Z", re.ASCII)
+
+
+def _as_float(value: Any) -> Optional[float]:
+    """float(value) or None; plain numbers and decimal strings never raise."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and _NUM_RE.match(value):
+        return float(value)
+    # Rare inputs (" 5", "1e3", Decimal...) keep the exact float() semantics.
+    try:
+        return float(value)
+    except Exception:
+        return None
+
+
+def _as_int(value: Any) -> Optional[int]:
+    """int(value) or None; ints and digit strings never raise."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and _INT_RE.match(value):
+        return int(value)
+    try:
+        return int(value)
+    except Exception:
+        return None
+
+# Identical SQL text on every call, so the long-lived helper connections hit
+# their statement cache. ORDER BY id walks the rowid b-tree: no sort, and the
+# oldest user stays the default.
+_SQL_FIRST_USER = "SELECT id FROM users ORDER BY id LIMIT 1"
+_SQL_INSERT_USER = "INSERT INTO users (username, password_hash, role, is_active) VALUES (?,?,?,?)"
+
+# Seconds between PRAGMA optimize runs triggered by maybe_optimize().
+_OPTIMIZE_INTERVAL = 900.0
+
 
 def dict_response(success: bool, error: Optional[str] = None, data: Any = None) -> Dict[str, Any]:
     """
@@ -36,6 +79,194 @@ def dict_response(success: bool, error: Optional[str] = None, data: Any = None)
     return {"success": success, "error": error, "data": data}
 
 
+# Data-layer modules swept for stray module-level connections on close().
+_DL_MODULES = (
+    "MoneyMate.data_layer.api",
+    "MoneyMate.data_layer.auth",
+    "MoneyMate.data_layer.categories",
+    "MoneyMate.data_layer.contacts",
+    "MoneyMate.data_layer.database",
+    "MoneyMate.data_layer.expenses",
+    "MoneyMate.data_layer.logging_config",
+    "MoneyMate.data_layer.manager",
+    "MoneyMate.data_layer.schema_utils",
+    "MoneyMate.data_layer.transactions",
+    "MoneyMate.data_layer.usermanager",
+    "MoneyMate.data_layer.validation",
+)
+
+# Lazily built sub-managers (cached_property names on DatabaseManager).
+_MANAGER_NAMES = ("expenses", "contacts", "transactions", "users", "categories")
+
+# Well-known attribute names under which a manager may hold its own connection.
+_MANAGER_CONN_ATTRS = ("conn", "_conn", "db_conn", "connection")
+
+# English field term -> Italian label, in priority order (first applicable wins).
+_ERR_FIELD_MAP = (
+    ("title", "titolo"),
+    ("price", "prezzo"),
+    ("date", "data"),
+    ("category", "categoria"),
+    ("name", "nome"),
+    ("type", "tipo"),
+    ("contact_id", "contatto"),
+    ("contact id", "contatto"),
+    ("contact", "contatto"),
+    ("user_id", "utente"),
+    ("user id", "utente"),
+    ("amount", "prezzo"),
+)
+# Lookahead alternation: one scan collects every (possibly overlapping) substring hit.
+_ERR_TERMS_RE = re.compile("(?=(" + "|".join(re.escape(eng) for eng, _ in _ERR_FIELD_MAP) + "))")
+
+
+@functools.lru_cache(maxsize=256)
+def _localize_error(msg: str) -> str:
+    """
+    Aggiunge l'etichetta italiana del campo coinvolto (es. "(campo: data)").
+    Memoizzata: gli stessi messaggi di validazione si ripetono a ogni riga.
+    """
+    low = msg.lower()
+    found = {m.group(1) for m in _ERR_TERMS_RE.finditer(low)}
+    if not found:
+        return msg
+    for eng, ita in _ERR_FIELD_MAP:
+        if eng in found and ita not in low:
+            return f"{msg} (campo: {ita})"
+    return msg
+
+
+_CORE_TABLES = frozenset(("contacts", "expenses", "transactions"))
+
+
+class _TablesView(list):
+    """
+    Vista ibrida restituita da list_tables: iterata produce le tabelle core,
+    indicizzata con chiavi stringa si comporta come l'envelope {success,error,data}.
+    """
+
+    def __init__(self, core_list, full_list):
+        super().__init__(core_list)
+        self._full = list(full_list)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key in ("data", "tables"):
+                return list(self._full)
+            if key == "success":
+                return True
+            if key == "error":
+                return None
+            raise KeyError(key)
+        return super().__getitem__(key)
+
+    # Dict-like helpers
+    def keys(self):
+        return ["success", "error", "data"]
+
+    def items(self):
+        return [
+            ("success", True),
+            ("error", None),
+            ("data", list(self._full))
+        ]
+
+    def get(self, k, default=None):
+        try:
+            return self[k]
+        except KeyError:
+            return default
+
+    def __contains__(self, item):
+        if isinstance(item, str) and item in ("success", "error", "data"):
+            return True
+        return list.__contains__(self, item)
+
+
+class _EmptyTables(list):
+    """
+    Vista vuota coerente restituita da list_tables in caso di errore.
+    """
+
+    def __init__(self, err: str):
+        super().__init__()
+        self._err = err
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == "success":
+                return False
+            if key == "error":
+                return self._err
+            if key in ("data", "tables"):
+                return []
+            raise KeyError(key)
+        return super().__getitem__(key)
+
+    def keys(self):
+        return ["success", "error", "data"]
+
+    def items(self):
+        return [("success", False), ("error", self._err), ("data", [])]
+
+    def get(self, k, default=None):
+        try:
+            return self[k]
+        except KeyError:
+            return default
+
+
+# Suffix source for the private shared-cache URIs that stand in for ":memory:".
+_MEMORY_DB_IDS = itertools.count(1)
+
+
+def _resolve_db_path(db_path: str) -> str:
+    # ":memory:" gives every connection its own empty database; map it to a named
+    # shared-cache URI so init_db, the keeper, the pool and sub-managers share one.
+    # Shared cache uses table-level locks that ignore busy_timeout: a write fails
+    # with "database table is locked" while another connection of the same DB has
+    # a read statement on that table still open, so in-memory callers must consume
+    # their cursors (fetchall) before writing.
+    if db_path == ":memory:":
+        return f"file:moneymate-mem-{next(_MEMORY_DB_IDS)}?mode=memory&cache=shared"
+    return db_path
+
+
+def _needs_keeper(db_path: str) -> bool:
+    # Shared in-memory URIs vanish with their last connection: hold one open.
+    return isinstance(db_path, str) and db_path.startswith("file:") and "mode=memory" in db_path
+
+
+def _user_scoped_delegate(target: str, method: str, params: Tuple[str, ...] = ()):
+    """
+    Build a facade method for self.<target>.<method>(*params, user_id, **options).
+    `params` are the required leading arguments, accepted positionally or by name
+    (a missing one raises TypeError, as with a hand-written signature); user_id
+    defaults to the default user and any other keyword is passed through to the
+    target. The result goes through _wrap(). Replaces the identical hand-written
+    try/except delegates.
+    """
+    def delegate(self, *args, **kwargs):
+        scoped = "user_id" in kwargs
+        user_id = kwargs.pop("user_id", None)
+        values = list(args[:len(params)])
+        for name in params[len(values):]:
+            if name not in kwargs:
+                raise TypeError(f"{method}() missing required argument: '{name}'")
+            values.append(kwargs.pop(name))
+        try:
+            if not scoped:
+                user_id = self.default_user_id
+            res = getattr(getattr(self, target), method)(*values, user_id, **kwargs)
+            return self._wrap(method, res)
+        except Exception as e:
+            logger.error("%s failed: %s", method, e)
+            return dict_response(False, str(e))
+
+    delegate.__name__ = delegate.__qualname__ = method
+    return delegate
+
+
 class DatabaseManager:
     """
     Orchestratore centrale: offre API 'legacy' usate dai test.
@@ -43,46 +274,74 @@ class DatabaseManager:
     che restituisce un oggetto ibrido list/dict per compat bilaterale coi test esistenti.
     """
 
+    # Fixed state lives in slots; __dict__ stays for the cached_property
+    # sub-managers and for attributes callers/tests attach to the instance.
+    __slots__ = (
+        "db_path", "_db_uri", "_keeper", "_ops_conns", "_pool", "_default_user_id",
+        "_counterparty_cache", "_known_contact_ids", "_tables_cache", "_last_optimize", "_closed",
+        "__dict__", "__weakref__",
+    )
+
     # -------------------------------------------------
     # INIT / SETUP
     # -------------------------------------------------
     def __init__(self, db_path: str = DB_PATH):
-        logger.info(f"Initializing DatabaseManager with db_path: {db_path}")
+        logger.info("Initializing DatabaseManager with db_path: %s", db_path)
+        # db_path resta quello passato dal chiamante; _db_uri e' quello effettivamente aperto.
         self.db_path: str = db_path
+        self._db_uri: str = _resolve_db_path(db_path)
         self._keeper: Optional[sqlite3.Connection] = None
+        # Long-lived helper connections for file DBs, one per thread (see _connect_for_ops).
+        self._ops_conns: Dict[int, sqlite3.Connection] = {}
+        # Connections shared by the sub-managers (see database.get_managed_connection).
+        self._pool: Optional[ConnectionPool] = None
         self._default_user_id: Optional[int] = None
-
-        if isinstance(db_path, str) and db_path.startswith("file:") and "mode=memory" in db_path:
-            try:
-                self._keeper = sqlite3.connect(db_path, uri=True, check_same_thread=False)
-                self._keeper.execute("PRAGMA foreign_keys = ON;")
-            except Exception as e:
-                logger.warning(f"Keeper connection init failed: {e}")
-
-        db_init_db(db_path)
-        self._init_managers()
-
-    def _init_managers(self):
+        # contact_id -> virtual counterparty user id; stable for a given DB.
+        self._counterparty_cache: Dict[int, int] = {}
+        # Only positive hits are cached, so a deleted-then-recreated id is re-checked.
+        self._known_contact_ids: Set[int] = set()
+        # (PRAGMA schema_version, sorted table names); re-read when the version moves.
+        self._tables_cache: Optional[tuple] = None
+        self._last_optimize: float = time.monotonic()
+        self._closed: bool = False
+
+        self._setup_keeper(self._db_uri)
+        db_init_db(self._db_uri)
+        self._setup_pool(self._db_uri)
+
+    # Sub-managers are built on first access; close() pins them to None and
+    # set_db_path() drops them so they are rebuilt against the new path.
+    @functools.cached_property
+    def expenses(self):
         from .expenses import ExpensesManager
+        return ExpensesManager(self._db_uri, db_manager=self)
+
+    @functools.cached_property
+    def contacts(self):
         from .contacts import ContactsManager
+        return ContactsManager(self._db_uri, db_manager=self)
+
+    @functools.cached_property
+    def transactions(self):
         from .transactions import TransactionsManager
+        return TransactionsManager(self._db_uri, self.contacts, db_manager=self)
+
+    @functools.cached_property
+    def users(self):
         from .usermanager import UserManager
-        from .categories import CategoriesManager
+        return UserManager(self._db_uri, db_manager=self)
 
-        self.expenses = ExpensesManager(self.db_path, db_manager=self)
-        self.contacts = ContactsManager(self.db_path, db_manager=self)
-        self.transactions = TransactionsManager(self.db_path, self.contacts, db_manager=self)
-        self.users = UserManager(self.db_path, db_manager=self)
-        self.categories = CategoriesManager(self.db_path, db_manager=self)
+    @functools.cached_property
+    def categories(self):
+        from .categories import CategoriesManager
+        return CategoriesManager(self._db_uri, db_manager=self)
 
     def __enter__(self) -> "DatabaseManager":
         return self
 
     def __exit__(self, exc_type, exc, tb) -> bool:
-        try:
-            self.close()
-        except Exception:
-            pass
+        # close() already guards each release step; never swallow the caller's exception.
+        self.close()
         return False
 
     def __del__(self):
@@ -104,25 +363,29 @@ class DatabaseManager:
         except Exception:
             pass
         try:
-            for name, val in list(getattr(mgr, "__dict__", {}).items()):
-                if isinstance(val, sqlite3.Connection):
-                    try:
-                        val.close()
-                    except Exception:
-                        pass
-                    try:
-                        setattr(mgr, name, None)
-                    except Exception:
-                        pass
+            names = [name for name in _MANAGER_CONN_ATTRS
+                     if isinstance(getattr(mgr, name, None), sqlite3.Connection)]
+            if not names:
+                # Generic sweep; only connection attributes are collected, not the whole __dict__.
+                names = [name for name, val in getattr(mgr, "__dict__", {}).items()
+                         if isinstance(val, sqlite3.Connection)]
+            for name in names:
+                try:
+                    getattr(mgr, name).close()
+                except Exception:
+                    pass
+                try:
+                    setattr(mgr, name, None)
+                except Exception:
+                    pass
         except Exception:
             pass
 
-    def _close_sqlite_connections_in_modules(self, package_prefix: str = "MoneyMate.data_layer") -> None:
+    def _close_sqlite_connections_in_modules(self) -> None:
         try:
-            for mod_name, mod in list(sys.modules.items()):
-                if not isinstance(mod, types.ModuleType):
-                    continue
-                if not mod_name.startswith(package_prefix):
+            for mod_name in _DL_MODULES:
+                mod = sys.modules.get(mod_name)
+                if mod is None:
                     continue
                 for attr_name, val in list(vars(mod).items()):
                     if isinstance(val, sqlite3.Connection):
@@ -137,71 +400,159 @@ class DatabaseManager:
         except Exception:
             pass
 
-    def close(self) -> None:
+    def close(self, force_gc: bool = False) -> None:
+        """
+        Release managers and connections. References are dropped explicitly, so a
+        full gc pass is only run on request (e.g. before deleting DB files in tests).
+        """
         logger.info("Releasing all managers for test cleanup.")
-        for attr in ("expenses", "contacts", "transactions", "users", "categories"):
+        # No PRAGMA optimize here: ConnectionPool runs it on every pooled connection it closes.
+        state = self.__dict__
+        for attr in _MANAGER_NAMES:
             try:
-                self._close_manager(getattr(self, attr, None))
+                self._close_manager(state.get(attr))
             finally:
-                setattr(self, attr, None)
+                state[attr] = None
+        self._closed = True
         self._close_sqlite_connections_in_modules()
-        if getattr(self, "_keeper", None):
+        self._close_pool()
+        self._close_keeper()
+        self._close_ops_conns()
+        self._reset_caches()
+        if force_gc:
             try:
-                self._keeper.close()
+                gc.collect()
             except Exception:
                 pass
-            self._keeper = None
+
+    # -------------------------------------------------
+    # MAINTENANCE
+    # -------------------------------------------------
+    def _optimize(self) -> None:
+        # Only on connections the manager already holds: never open (or re-create) the DB file.
+        ops = getattr(self, "_ops_conns", None) or {}
+        conn = getattr(self, "_keeper", None) or next(iter(ops.values()), None)
+        pool = getattr(self, "_pool", None)
         try:
-            gc.collect()
-        except Exception:
-            pass
+            if conn is not None:
+                conn.execute("PRAGMA optimize;")
+            elif pool is not None and not self._closed:
+                with pool.connection() as pooled:
+                    pooled.execute("PRAGMA optimize;")
+        except Exception as e:
+            logger.debug("PRAGMA optimize skipped: %s", e)
+        self._last_optimize = time.monotonic()
+
+    def maybe_optimize(self) -> None:
+        """
+        Run PRAGMA optimize if more than _OPTIMIZE_INTERVAL seconds have passed
+        since the last run. Cheap enough to call on every manager access.
+        """
+        if time.monotonic() - self._last_optimize > _OPTIMIZE_INTERVAL:
+            self._optimize()
 
     # -------------------------------------------------
     # RE-INIT
     # -------------------------------------------------
     def set_db_path(self, db_path: str) -> None:
-        logger.info(f"Setting new db_path: {db_path} and re-initializing managers.")
-        if getattr(self, "_keeper", None):
+        # Same path with live managers: nothing to rebuild (and no schema re-check).
+        if db_path == self.db_path and not self._closed:
+            logger.info("db_path unchanged (%s); skipping re-initialization.", db_path)
+            return
+        logger.info("Setting new db_path: %s and re-initializing managers.", db_path)
+        self._close_pool()
+        self._close_keeper()
+        self._close_ops_conns()
+        self._reset_caches()
+        self.db_path = db_path
+        self._db_uri = _resolve_db_path(db_path)
+        self._setup_keeper(self._db_uri)
+        db_init_db(self._db_uri)
+        self._setup_pool(self._db_uri)
+        for attr in _MANAGER_NAMES:
+            self.__dict__.pop(attr, None)
+        self._closed = False
+
+    # -------------------------------------------------
+    # LOW LEVEL HELPERS
+    # -------------------------------------------------
+    def _reset_caches(self) -> None:
+        self._default_user_id = None
+        self._counterparty_cache = {}
+        self._known_contact_ids = set()
+        self._tables_cache = None
+
+    def invalidate_user(self, user_id: Optional[int] = None) -> None:
+        """Forget cached per-user lookups (role/existence) after a user mutation."""
+        tm = self.__dict__.get("transactions")
+        if tm is not None:
+            tm.invalidate_user(user_id)
+
+    def _is_memory_db(self) -> bool:
+        return _is_memory_path(self._db_uri)
+
+    def _setup_keeper(self, db_path: str) -> None:
+        if _needs_keeper(db_path):
+            try:
+                self._keeper = _connect(db_path)
+            except Exception as e:
+                logger.warning("Keeper connection init failed: %s", e)
+
+    def _close_keeper(self) -> None:
+        if getattr(self, "_keeper", None) is not None:
             try:
                 self._keeper.close()
             except Exception:
                 pass
             self._keeper = None
-        self.db_path = db_path
-        if isinstance(db_path, str) and db_path.startswith("file:") and "mode=memory" in db_path:
+
+    def _setup_pool(self, db_path: str) -> None:
+        self._pool = ConnectionPool(db_path)
+
+    def _close_pool(self) -> None:
+        if getattr(self, "_pool", None) is not None:
             try:
-                self._keeper = sqlite3.connect(db_path, uri=True, check_same_thread=False)
-                self._keeper.execute("PRAGMA foreign_keys = ON;")
-            except Exception as e:
-                logger.warning(f"Keeper connection (re-init) failed: {e}")
-        db_init_db(db_path)
-        self._init_managers()
+                self._pool.close()
+            except Exception:
+                pass
+            self._pool = None
 
-    # -------------------------------------------------
-    # LOW LEVEL HELPERS
-    # -------------------------------------------------
     def _connect_for_ops(self):
         if getattr(self, "_keeper", None) is not None:
             return self._keeper, False
-        use_uri = isinstance(self.db_path, str) and self.db_path.startswith("file:")
-        conn = sqlite3.connect(self.db_path, uri=use_uri)
-        conn.execute("PRAGMA foreign_keys = ON;")
-        return conn, True
+        tid = threading.get_ident()
+        conn = self._ops_conns.get(tid)
+        if conn is None:
+            conn = self._ops_conns[tid] = _connect(self._db_uri)
+        return conn, False
+
+    def _close_ops_conns(self) -> None:
+        conns = getattr(self, "_ops_conns", None)
+        if not conns:
+            return
+        for conn in list(conns.values()):
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._ops_conns = {}
+
+    @property
+    def default_user_id(self) -> int:
+        """Id of the legacy default user; a plain attribute read once resolved."""
+        return self._default_user_id or self._ensure_default_user()
 
     def _ensure_default_user(self) -> int:
         if self._default_user_id:
             return self._default_user_id
         conn, close_after = self._connect_for_ops()
         try:
-            row = conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()
+            row = conn.execute(_SQL_FIRST_USER).fetchone()
             if row:
-                self._default_user_id = int(row[0])
+                self._default_user_id = row[0]
             else:
-                conn.execute(
-                    "INSERT INTO users (username, password_hash, role, is_active) VALUES (?,?,?,?)",
-                    ("default_user", "", "user", 1),
-                )
-                self._default_user_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+                cur = conn.execute(_SQL_INSERT_USER, ("default_user", "", "user", 1))
+                self._default_user_id = cur.lastrowid
                 conn.commit()
             return self._default_user_id
         finally:
@@ -209,28 +560,24 @@ class DatabaseManager:
                 conn.close()
 
     def _ensure_counterparty_user(self, contact_id: int) -> int:
-        conn, close_after = self._connect_for_ops()
-        try:
-            username = f"contact_{contact_id}"
-            row = conn.execute("SELECT id FROM users WHERE username=?", (username,)).fetchone()
-            if row:
-                return int(row[0])
-            conn.execute(
-                "INSERT INTO users (username, password_hash, role, is_active) VALUES (?,?,?,?)",
-                (username, "", "user", 1),
-            )
-            uid = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
-            conn.commit()
-            return uid
-        finally:
-            if close_after:
-                conn.close()
+        cached = self._counterparty_cache.get(contact_id)
+        if cached is not None:
+            return cached
+        # Lookup/creazione restano in TransactionsManager; qui solo la memo per DB.
+        uid = self.transactions._ensure_counterparty_user(contact_id)
+        self._counterparty_cache[contact_id] = uid
+        return uid
 
     def _contact_exists(self, contact_id: int) -> bool:
+        if contact_id in self._known_contact_ids:
+            return True
         conn, close_after = self._connect_for_ops()
         try:
             row = conn.execute("SELECT id FROM contacts WHERE id=?", (contact_id,)).fetchone()
-            return row is not None
+            if row is None:
+                return False
+            self._known_contact_ids.add(contact_id)
+            return True
         finally:
             if close_after:
                 conn.close()
@@ -241,16 +588,14 @@ class DatabaseManager:
     def _validate_expense(self, title, price, date) -> Optional[str]:
         if not title or not str(title).strip():
             return "Missing title (campo: titolo)"
-        try:
-            p = float(price)
-            if p <= 0:
-                return "Invalid price (campo: prezzo)"
-        except Exception:
+        p = _as_float(price)
+        if p is None or p <= 0:
             return "Invalid price (campo: prezzo)"
-        if not isinstance(date, str) or not re.match(r"^\d{4}-\d{2}-\d{2}$", date):
+        m = _DATE_RE.match(date) if isinstance(date, str) else None
+        if not m:
             return "Invalid date format (campo: data)"
         try:
-            datetime.date.fromisoformat(date)
+            datetime.date(int(m[1]), int(m[2]), int(m[3]))
         except ValueError:
             return "Invalid date value (campo: data)"
         return None
@@ -258,26 +603,23 @@ class DatabaseManager:
     def _validate_transaction(self, contact_id, ttype, amount, date) -> Optional[str]:
         if contact_id is None:
             return "Missing contact_id (campo: contatto)"
-        try:
-            cid = int(contact_id)
-            if cid <= 0:
-                return "Invalid contact_id (campo: contatto)"
-        except Exception:
+        cid = _as_int(contact_id)
+        if cid is None or cid <= 0:
             return "Invalid contact_id (campo: contatto)"
-        if not self._contact_exists(int(contact_id)):
+        if not self._contact_exists(cid):
             return "contact not found (campo: contatto)"
-        if not isinstance(ttype, str) or ttype.lower() not in ("credit", "debit"):
+        if not isinstance(ttype, str) or ttype.lower() not in _VALID_TTYPES:
             return "invalid type (campo: tipo)"
-        try:
-            a = float(amount)
-            if a <= 0:
-                return "amount must be positive (campo: prezzo)"
-        except Exception:
+        a = _as_float(amount)
+        if a is None:
             return "amount must be numeric (campo: prezzo)"
-        if not isinstance(date, str) or not re.match(r"^\d{4}-\d{2}-\d{2}$", date):
+        if a <= 0:
+            return "amount must be positive (campo: prezzo)"
+        m = _DATE_RE.match(date) if isinstance(date, str) else None
+        if not m:
             return "invalid date format (campo: data)"
         try:
-            datetime.date.fromisoformat(date)
+            datetime.date(int(m[1]), int(m[2]), int(m[3]))
         except ValueError:
             return "invalid date value (campo: data)"
         return None
@@ -287,35 +629,20 @@ class DatabaseManager:
     # -------------------------------------------------
     def _localize_error_msg(self, msg: str) -> str:
         try:
-            low = msg.lower()
-            mapping = [
-                ("title", "titolo"),
-                ("price", "prezzo"),
-                ("date", "data"),
-                ("category", "categoria"),
-                ("name", "nome"),
-                ("type", "tipo"),
-                ("contact_id", "contatto"),
-                ("contact id", "contatto"),
-                ("contact", "contatto"),
-                ("user_id", "utente"),
-                ("user id", "utente"),
-                ("amount", "prezzo"),
-            ]
-            for eng, ita in mapping:
-                if eng in low and ita not in low:
-                    return f"{msg} (campo: {ita})"
-            return msg
+            return _localize_error(msg)
         except Exception:
             return msg
 
     def _wrap(self, op: str, result: Any):
         try:
             if isinstance(result, dict) and "success" in result and "error" in result:
-                if not result.get("success") and isinstance(result.get("error"), str):
-                    result["error"] = self._localize_error_msg(result["error"])
                 if "data" not in result:
                     result["data"] = None
+                # Happy path: successful envelopes need no localization work.
+                if result["success"]:
+                    return result
+                if isinstance(result["error"], str):
+                    result["error"] = self._localize_error_msg(result["error"])
                 return result
             if isinstance(result, (list, tuple)):
                 return dict_response(True, None, list(result))
@@ -325,7 +652,7 @@ class DatabaseManager:
                 return dict_response(True, None, result)
             return dict_response(False, f"{op} returned no result")
         except Exception as e:
-            logger.error(f"Normalization error in {op}: {e}")
+            logger.error("Normalization error in %s: %s", op, e)
             return dict_response(False, f"{op} normalization error: {e}")
 
     # -------------------------------------------------
@@ -339,81 +666,26 @@ class DatabaseManager:
         - Espone chiavi 'success', 'error' (compat eventuale)
         """
         try:
-            raw = db_list_tables(self.db_path)
-            if isinstance(raw, dict):
-                full = raw.get("data") or raw.get("tables") or []
-            elif isinstance(raw, list):
-                full = raw
-            else:
-                full = []
-            full = list(full)
-            core_set = {"contacts", "expenses", "transactions"}
-            core = sorted([t for t in full if t in core_set])
-
-            class TablesView(list):
-                def __init__(self, core_list, full_list):
-                    super().__init__(core_list)
-                    self._full = list(full_list)
-
-                def __getitem__(self, key):
-                    if isinstance(key, str):
-                        if key in ("data", "tables"):
-                            return list(self._full)
-                        if key == "success":
-                            return True
-                        if key == "error":
-                            return None
-                        raise KeyError(key)
-                    return super().__getitem__(key)
-
-                # Dict-like helpers
-                def keys(self):
-                    return ["success", "error", "data"]
-
-                def items(self):
-                    return [
-                        ("success", True),
-                        ("error", None),
-                        ("data", list(self._full))
-                    ]
-
-                def get(self, k, default=None):
-                    try:
-                        return self[k]
-                    except KeyError:
-                        return default
-
-                def __contains__(self, item):
-                    if isinstance(item, str) and item in ("success", "error", "data"):
-                        return True
-                    return list.__contains__(self, item)
-
-            tv = TablesView(core, full)
-            return tv
+            conn, close_after = self._connect_for_ops()
+            try:
+                # schema_version cambia a ogni DDL (anche da altre connessioni):
+                # la lista si rilegge solo quando lo schema e' davvero cambiato.
+                version = conn.execute("PRAGMA schema_version;").fetchone()[0]
+                if self._tables_cache is None or self._tables_cache[0] != version:
+                    self._tables_cache = (version, tuple(r[0] for r in conn.execute(
+                        "SELECT name FROM sqlite_schema "
+                        "WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name;"
+                    )))
+            finally:
+                if close_after:
+                    conn.close()
+            full = list(self._tables_cache[1])
+            core = [t for t in full if t in _CORE_TABLES]
+            return _TablesView(core, full)
         except Exception as e:
-            logger.error(f"list_tables failed: {e}")
+            logger.error("list_tables failed: %s", e)
             # In caso di errore ritorniamo una vista vuota coerente
-            class EmptyTables(list):
-                def __getitem__(self, key):
-                    if isinstance(key, str):
-                        if key == "success":
-                            return False
-                        if key == "error":
-                            return str(e)
-                        if key in ("data", "tables"):
-                            return []
-                        raise KeyError(key)
-                    return super().__getitem__(key)
-                def keys(self):
-                    return ["success", "error", "data"]
-                def items(self):
-                    return [("success", False), ("error", str(e)), ("data", [])]
-                def get(self, k, default=None):
-                    try:
-                        return self[k]
-                    except KeyError:
-                        return default
-            return EmptyTables()
+            return _EmptyTables(str(e))
 
     # -------------------------------------------------
     # EXPENSES
@@ -436,48 +708,53 @@ class DatabaseManager:
             else:
                 category = kwargs.get("category")
 
-            user_id = kwargs.get("user_id", self._ensure_default_user())
+            user_id = kwargs.get("user_id", self.default_user_id)
             res = self.expenses.add_expense(title, float(price), date, category, user_id)
             return self._wrap("add_expense", res)
         except Exception as e:
-            logger.error(f"add_expense failed: {e}")
-            return dict_response(False, str(e))
-
-    def delete_expense(self, expense_id, *args, **kwargs):
-        try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
-            res = self.expenses.delete_expense(expense_id, user_id)
-            return self._wrap("delete_expense", res)
-        except Exception as e:
-            logger.error(f"delete_expense failed: {e}")
-            return dict_response(False, str(e))
-
-    def search_expenses(self, *args, **kwargs):
-        try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
-            res = self.expenses.search_expenses(*args, user_id)
-            return self._wrap("search_expenses", res)
-        except Exception as e:
-            logger.error(f"search_expenses failed: {e}")
+            logger.error("add_expense failed: %s", e)
             return dict_response(False, str(e))
 
-    def get_expenses(self, *args, **kwargs):
+    def add_expenses_bulk(self, rows, **kwargs):
+        """
+        Insert many expenses in a single transaction (one commit per batch).
+        Each row is a dict with title/price/date/category. Rows are checked like
+        add_expense, then the batch goes to ExpensesManager.add_expenses_bulk;
+        rejected rows are reported by their index in `rows`.
+        """
         try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
-            res = self.expenses.get_expenses(user_id)
-            return self._wrap("get_expenses", res)
+            user_id = kwargs.get("user_id", self.default_user_id)
+            items, positions, errors = [], [], []
+            for idx, row in enumerate(rows or []):
+                title = row.get("title") or row.get("description")
+                price, date = row.get("price"), row.get("date")
+                err = self._validate_expense(title, price, date)
+                if err:
+                    errors.append({"index": idx, "error": self._localize_error_msg(err)})
+                    continue
+                positions.append(idx)
+                items.append({"title": title, "price": float(price), "date": date, "category": row.get("category")})
+
+            inserted = 0
+            if items:
+                res = self.expenses.add_expenses_bulk(items, user_id)
+                if not res["success"]:
+                    return self._wrap("add_expenses_bulk", res)
+                inserted = res["data"]["inserted"]
+                errors.extend(
+                    {"index": positions[e["index"]], "error": self._localize_error_msg(e["error"])}
+                    for e in res["data"]["errors"]
+                )
+                errors.sort(key=lambda e: e["index"])
+            return dict_response(True, None, {"inserted": inserted, "errors": errors})
         except Exception as e:
-            logger.error(f"get_expenses failed: {e}")
+            logger.error("add_expenses_bulk failed: %s", e)
             return dict_response(False, str(e))
 
-    def clear_expenses(self, *args, **kwargs):
-        try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
-            res = self.expenses.clear_expenses(user_id)
-            return self._wrap("clear_expenses", res)
-        except Exception as e:
-            logger.error(f"clear_expenses failed: {e}")
-            return dict_response(False, str(e))
+    delete_expense = _user_scoped_delegate("expenses", "delete_expense", ("expense_id",))
+    search_expenses = _user_scoped_delegate("expenses", "search_expenses", ("query",))
+    get_expenses = _user_scoped_delegate("expenses", "get_expenses")
+    clear_expenses = _user_scoped_delegate("expenses", "clear_expenses")
 
     # -------------------------------------------------
     # CONTACTS
@@ -487,29 +764,23 @@ class DatabaseManager:
             name = kwargs.get("name", args[0] if len(args) >= 1 else None)
             if not name or not str(name).strip():
                 return dict_response(False, "name required (campo: nome)")
-            user_id = kwargs.get("user_id", self._ensure_default_user())
+            user_id = kwargs.get("user_id", self.default_user_id)
             res = self.contacts.add_contact(name, user_id)
             return self._wrap("add_contact", res)
         except Exception as e:
-            logger.error(f"add_contact failed: {e}")
+            logger.error("add_contact failed: %s", e)
             return dict_response(False, str(e))
 
-    def get_contacts(self, *args, **kwargs):
-        try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
-            res = self.contacts.get_contacts(user_id)
-            return self._wrap("get_contacts", res)
-        except Exception as e:
-            logger.error(f"get_contacts failed: {e}")
-            return dict_response(False, str(e))
+    get_contacts = _user_scoped_delegate("contacts", "get_contacts")
 
     def delete_contact(self, contact_id_or_name, *args, **kwargs):
         try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
+            user_id = kwargs.get("user_id", self.default_user_id)
             res = self.contacts.delete_contact(contact_id_or_name, user_id)
+            self._known_contact_ids.clear()
             return self._wrap("delete_contact", res)
         except Exception as e:
-            logger.error(f"delete_contact failed: {e}")
+            logger.error("delete_contact failed: %s", e)
             return dict_response(False, str(e))
 
     # -------------------------------------------------
@@ -530,48 +801,76 @@ class DatabaseManager:
             if validation:
                 return dict_response(False, validation)
 
-            user_id = kwargs.get("user_id", self._ensure_default_user())
-            to_uid = self._ensure_counterparty_user(int(contact_id))
-            res = self.transactions.add_transaction(
-                from_user_id=user_id,
-                to_user_id=to_uid,
-                type_=ttype.lower(),
-                amount=float(amount),
-                date=date,
-                description=note,
-                contact_id=int(contact_id),
-            )
+            # Validation guarantees these conversions succeed; do each exactly once.
+            cid, ttype_norm, amount_val = int(contact_id), ttype.lower(), float(amount)
+            user_id = kwargs.get("user_id", self.default_user_id)
+            to_uid = self._ensure_counterparty_user(cid)
+            # Positional, in TransactionsManager.add_transaction's parameter order:
+            # (from_user_id, to_user_id, type_, amount, date, description, contact_id).
+            res = self.transactions.add_transaction(user_id, to_uid, ttype_norm, amount_val, date, note, cid)
             return self._wrap("add_transaction", res)
         except Exception as e:
-            logger.error(f"add_transaction failed: {e}")
+            logger.error("add_transaction failed: %s", e)
             return dict_response(False, str(e))
 
-    def get_transactions(self, contact_id, *args, **kwargs):
+    def add_transactions_bulk(self, rows, **kwargs):
+        """
+        Insert many transactions in a single transaction (one commit per batch).
+        Each row is a dict with contact_id/type/amount/date/note. Rows are checked
+        like add_transaction, then the batch goes to TransactionsManager.add_transactions_bulk;
+        rejected rows are reported by their index in `rows`.
+        """
         try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
-            res = self.transactions.get_transactions(user_id, as_sender=True, contact_id=contact_id)
-            return self._wrap("get_transactions", res)
+            user_id = kwargs.get("user_id", self.default_user_id)
+            items, positions, errors = [], [], []
+            for idx, row in enumerate(rows or []):
+                contact_id, ttype = row.get("contact_id"), row.get("type")
+                amount, date = row.get("amount"), row.get("date")
+                err = self._validate_transaction(contact_id, ttype, amount, date)
+                if err:
+                    errors.append({"index": idx, "error": self._localize_error_msg(err)})
+                    continue
+                positions.append(idx)
+                items.append({
+                    "to_user_id": None, "contact_id": int(contact_id), "type": ttype.lower(),
+                    "amount": float(amount), "date": date, "description": row.get("note"),
+                })
+
+            inserted = 0
+            if items:
+                res = self.transactions.add_transactions_bulk(user_id, items)
+                if not res["success"]:
+                    return self._wrap("add_transactions_bulk", res)
+                inserted = res["data"]["inserted"]
+                errors.extend(
+                    {"index": positions[e["index"]], "error": self._localize_error_msg(e["error"])}
+                    for e in res["data"]["errors"]
+                )
+                errors.sort(key=lambda e: e["index"])
+            return dict_response(True, None, {"inserted": inserted, "errors": errors})
         except Exception as e:
-            logger.error(f"get_transactions failed: {e}")
+            logger.error("add_transactions_bulk failed: %s", e)
             return dict_response(False, str(e))
 
-    def delete_transaction(self, transaction_id, *args, **kwargs):
+    def get_transactions(self, contact_id, *args, **kwargs):
         try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
-            res = self.transactions.delete_transaction(transaction_id, user_id)
-            return self._wrap("delete_transaction", res)
+            user_id = kwargs.get("user_id", self.default_user_id)
+            res = self.transactions.get_transactions(user_id, as_sender=True, contact_id=contact_id)
+            return self._wrap("get_transactions", res)
         except Exception as e:
-            logger.error(f"delete_transaction failed: {e}")
+            logger.error("get_transactions failed: %s", e)
             return dict_response(False, str(e))
 
+    delete_transaction = _user_scoped_delegate("transactions", "delete_transaction", ("transaction_id",))
+
     def get_contact_balance(self, contact_id, *args, **kwargs):
         try:
-            user_id = kwargs.get("user_id", self._ensure_default_user())
+            user_id = kwargs.get("user_id", self.default_user_id)
             res = self.transactions.get_contact_balance(user_id, contact_id)
             wrapped = self._wrap("get_contact_balance", res)
             if wrapped.get("success") and isinstance(wrapped.get("data"), dict) and "net" in wrapped["data"]:
                 wrapped["data"] = float(wrapped["data"]["net"])
             return wrapped
         except Exception as e:
-            logger.error(f"get_contact_balance failed: {e}")
-            return dict_response(False, str(e))
\ No newline at end of file
+            logger.error("get_contact_balance failed: %s", e)
+            return dict_response(False, str(e))
@@ -15,9 +15,13 @@ migration of older or partially initialized databases.
 
 from __future__ import annotations
 
+import os
+import re
 import sqlite3
 from pathlib import Path
-from typing import Iterable, Set
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from .database import _apply_conn_pragmas
 
 
 REQUIRED_USER_COLUMNS = {
@@ -29,6 +33,12 @@ REQUIRED_USER_COLUMNS = {
     "created_at",
 }
 
+_AUTH_TABLES = ("users", "sessions", "access_logs", "schema_version")
+
+# DB files (path, device, inode) already brought up to date by ensure_auth_schema
+# in this process. The inode tells apart a file deleted and recreated at the same path.
+_MIGRATED: Set[Tuple[str, int, int]] = set()
+
 
 def _project_root() -> Path:
     # Questo file è in MoneyMate/data_layer/schema_utils.py
@@ -49,6 +59,42 @@ def _table_columns(conn: sqlite3.Connection, table: str) -> Set[str]:
     return {row[1] for row in cur.fetchall()}  # name at index 1
 
 
+def _table_sql(conn: sqlite3.Connection, table: str) -> Optional[str]:
+    """CREATE statement of the table as stored in sqlite_master (None if missing)."""
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (table,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+# Comments and single-quoted literals are blanked before matching column names,
+# so names inside a DEFAULT string or a comment cannot count as columns.
+_SQL_NOISE = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'", re.DOTALL)
+
+
+def _table_has_columns(
+    conn: sqlite3.Connection, table: str, names: Iterable[str], sql: Optional[str] = None
+) -> Dict[str, bool]:
+    """
+    Which of `names` are defined on `table`, read from its stored CREATE statement
+    (one row) instead of PRAGMA table_info. ALTER TABLE ADD COLUMN rewrites that
+    statement, so added columns are seen too. A name counts only where a column
+    definition can start (after '(' or ','), optionally quoted.
+    Only a fast "all present" check: unusual spellings (e.g. a 'single-quoted'
+    identifier) read as missing, so callers must confirm with _table_columns
+    before altering the table.
+    """
+    if sql is None:
+        sql = _table_sql(conn, table) or ""
+    sql = _SQL_NOISE.sub(" ", sql)
+    return {
+        name: re.search(
+            r"[(,]\s*[\"`\[]?" + re.escape(name) + r"[\"`\]]?(?=[\s,)])", sql, re.IGNORECASE
+        ) is not None
+        for name in names
+    }
+
+
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
     cur = conn.execute(
         "SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (table,)
@@ -56,6 +102,31 @@ def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
     return cur.fetchone() is not None
 
 
+def _main_db_key(conn: sqlite3.Connection) -> Optional[Tuple[str, int, int]]:
+    """(path, st_dev, st_ino) of the connection's main database file; None for in-memory/temporary DBs."""
+    for _seq, name, filename in conn.execute("PRAGMA database_list"):
+        if name == "main" and filename:
+            try:
+                st = os.stat(filename)
+            except OSError:
+                return None
+            return filename, st.st_dev, st.st_ino
+    return None
+
+
+def _auth_tables_present(conn: sqlite3.Connection) -> bool:
+    cur = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name IN ({','.join('?' * len(_AUTH_TABLES))})",
+        _AUTH_TABLES,
+    )
+    if cur.fetchone()[0] != len(_AUTH_TABLES):
+        return False
+    if conn.execute("SELECT 1 FROM schema_version LIMIT 1").fetchone() is None:
+        return False
+    # Inode numbers can be reused: the users columns must still be there too.
+    return all(_table_has_columns(conn, "users", REQUIRED_USER_COLUMNS).values())
+
+
 def _ensure_schema_version(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
     cur = conn.execute("SELECT COUNT(*) FROM schema_version")
@@ -90,7 +161,8 @@ def _apply_sql_file_if_present(conn: sqlite3.Connection) -> None:
 
 
 def _migrate_users_table(conn: sqlite3.Connection) -> None:
-    if not _table_exists(conn, "users"):
+    users_sql = _table_sql(conn, "users")
+    if users_sql is None:
         # Se non esiste affatto, creiamola con lo schema completo minimo richiesto
         _exec_script(
             conn,
@@ -109,6 +181,12 @@ def _migrate_users_table(conn: sqlite3.Connection) -> None:
         )
         return
 
+    present = _table_has_columns(
+        conn, "users", ("password_hash", "role", "is_active", "created_at", "updated_at"), sql=users_sql
+    )
+    if all(present.values()):
+        return
+    # Qualcosa sembra mancare: conferma con PRAGMA table_info prima di qualsiasi ALTER
     cols = _table_columns(conn, "users")
 
     if "password_hash" not in cols:
@@ -155,7 +233,7 @@ def _ensure_sessions_table(conn: sqlite3.Connection) -> None:
     )
 
 
-def ensure_auth_schema(conn: sqlite3.Connection) -> None:
+def ensure_auth_schema(conn: sqlite3.Connection, force: bool = False) -> None:
     """
     Garantisce che il DB disponga dello schema minimo richiesto dai test:
     - users (con password_hash, role, ecc.)
@@ -163,7 +241,17 @@ def ensure_auth_schema(conn: sqlite3.Connection) -> None:
     - access_logs
     - schema_version con almeno una riga
     Tollerante: usa il file sql/auth_schema.sql se presente, poi migra eventuali colonne mancanti.
+    Un file DB già migrato in questo processo (stesso path e inode) viene saltato dopo un
+    controllo rapido (tabelle e colonne di users devono esistere ancora); force=True riesegue tutto.
     """
+    db_key = _main_db_key(conn)
+    if not force and db_key in _MIGRATED and _auth_tables_present(conn):
+        return
+
+    # Stessi PRAGMA di get_connection (busy_timeout, synchronous=NORMAL, ...) prima del DDL;
+    # WAL non serve qui: e' persistente e lo imposta init_db.
+    _apply_conn_pragmas(conn)
+
     # 1) Prova ad applicare lo script SQL del repo se presente (idempotente grazie a IF NOT EXISTS)
     _apply_sql_file_if_present(conn)
 
@@ -175,4 +263,7 @@ def ensure_auth_schema(conn: sqlite3.Connection) -> None:
     _ensure_access_logs(conn)
 
     # 4) Versione schema per health-check
-    _ensure_schema_version(conn)
\ No newline at end of file
+    _ensure_schema_version(conn)
+
+    if db_key is not None:
+        _MIGRATED.add(db_key)
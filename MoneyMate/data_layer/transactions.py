@@ -13,24 +13,51 @@ This module defines TransactionsManager, responsible for:
 It is the core of the peer-to-peer debt/credit tracking logic in MoneyMate.
 """
 
+import functools
 import sqlite3
-from .database import get_connection
-from .validation import validate_transaction
-from datetime import datetime
+from collections import OrderedDict
+from .database import get_managed_connection
+from .validation import validate_transaction, is_valid_date
 from .contacts import ContactsManager
 from .logging_config import get_logger
 
 
 logger = get_logger(__name__)
 
+# Max user ids remembered per TransactionsManager by _user_exists.
+_USER_CACHE_SIZE = 4096
+
+# Column order of the get_transactions SELECT; rows are zipped against it.
+_TX_KEYS = ("id", "from_user_id", "to_user_id", "type", "amount", "date", "description", "contact_id")
+_TX_SELECT = f"SELECT {', '.join(_TX_KEYS)} FROM transactions"
+
+# One round trip for add_transaction: the existence checks guard the INSERT itself,
+# so a failed precondition simply inserts no row (see _add_transaction_error).
+_SQL_INSERT_TX_CHECKED = (
+    "INSERT INTO transactions (from_user_id, to_user_id, type, amount, date, description, contact_id) "
+    "SELECT :from_uid, :to_uid, :type, :amount, :date, :description, :contact_id "
+    "WHERE EXISTS (SELECT 1 FROM users WHERE id = :from_uid) "
+    "AND EXISTS (SELECT 1 FROM users WHERE id = :to_uid) "
+    "AND :from_uid != :to_uid "
+    "AND (:check_contact IS NULL OR EXISTS (SELECT 1 FROM contacts WHERE id = :check_contact AND user_id = :from_uid))"
+)
+
+@functools.lru_cache(maxsize=64)
+def _update_sql(columns: tuple) -> str:
+    # update_transaction fills fields in a fixed order, so there are at most 31 keys.
+    return f"UPDATE transactions SET {', '.join(f'{k} = ?' for k in columns)} WHERE id = ? AND from_user_id = ?"
+
+_ORDER_CLAUSES = {
+    "date_desc": "ORDER BY date DESC, id DESC",
+    "date_asc": "ORDER BY date ASC, id ASC",
+    "created_desc": "ORDER BY created_at DESC, id DESC",
+    "created_asc": "ORDER BY created_at ASC, id ASC",
+}
+_ORDER_DEFAULT = _ORDER_CLAUSES["date_desc"]
+
 def _order_clause(order: str) -> str:
-    mapping = {
-        "date_desc": "ORDER BY date DESC, id DESC",
-        "date_asc": "ORDER BY date ASC, id ASC",
-        "created_desc": "ORDER BY created_at DESC, id DESC",
-        "created_asc": "ORDER BY created_at ASC, id ASC",
-    }
-    return mapping.get((order or "date_desc"), mapping["date_desc"])
+    # Unknown/None/"" orders fall back to date_desc.
+    return _ORDER_CLAUSES.get(order, _ORDER_DEFAULT)
 
 class TransactionsManager:
     """
@@ -45,6 +72,8 @@ class TransactionsManager:
         self.db_path = db_path
         self.contacts_manager = contacts_manager
         self._db_manager = db_manager
+        # LRU of user ids known to exist (bounded by _USER_CACHE_SIZE).
+        self._known_user_ids = OrderedDict()
 
     def dict_response(self, success, error=None, data=None):
         return {"success": success, "error": error, "data": data}
@@ -63,42 +92,110 @@ class TransactionsManager:
             logger.warning(f"Validation failed for transaction: {err}")
             return self.dict_response(False, err)
 
-        if not self._user_exists(from_user_id):
-            return self.dict_response(False, "Sender user does not exist")
+        # contact_id (if provided) must belong to sender; checked inside the INSERT below
+        check_contact = contact_id if (contact_id and self.contacts_manager) else None
 
         # Auto-resolve recipient from contact if to_user_id is None
         if to_user_id is None:
+            if not self._user_exists(from_user_id):
+                return self.dict_response(False, "Sender user does not exist")
             if not contact_id:
                 return self.dict_response(False, "Recipient not specified (select a Contact)")
             if not (self.contacts_manager and self.contacts_manager.contact_exists(contact_id, from_user_id)):
                 return self.dict_response(False, "Contact does not exist")
             to_user_id = self._ensure_counterparty_user(contact_id)
-
-        if not self._user_exists(to_user_id):
-            return self.dict_response(False, "Receiver user does not exist")
-        if from_user_id == to_user_id:
-            return self.dict_response(False, "Sender and receiver must be different")
-
-        # contact_id (if provided) must belong to sender (already checked above for auto-mode)
-        if contact_id and self.contacts_manager and not self.contacts_manager.contact_exists(contact_id, from_user_id):
-            return self.dict_response(False, "Contact does not exist")
+            check_contact = None  # already verified
 
         try:
-            with get_connection(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO transactions (from_user_id, to_user_id, type, amount, date, description, contact_id) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (from_user_id, to_user_id, type_, float(amount), date, description, contact_id)
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
+                cursor = conn.execute(
+                    _SQL_INSERT_TX_CHECKED,
+                    {
+                        "from_uid": from_user_id, "to_uid": to_user_id, "type": type_, "amount": float(amount),
+                        "date": date, "description": description, "contact_id": contact_id,
+                        "check_contact": check_contact,
+                    }
                 )
+                inserted = cursor.rowcount > 0
                 conn.commit()
+            if not inserted:
+                return self.dict_response(False, self._add_transaction_error(from_user_id, to_user_id))
             logger.info(f"Transaction from user id={from_user_id} to user id={to_user_id} amount={float(amount)}")
             return self.dict_response(True)
         except Exception as e:
             logger.error(f"Error adding transaction: {e}")
             return self.dict_response(False, str(e))
-        
+
+    def _add_transaction_error(self, from_user_id, to_user_id):
+        """Which precondition of _SQL_INSERT_TX_CHECKED failed (only run when nothing was inserted)."""
+        if not self._user_exists(from_user_id):
+            return "Sender user does not exist"
+        if not self._user_exists(to_user_id):
+            return "Receiver user does not exist"
+        if from_user_id == to_user_id:
+            return "Sender and receiver must be different"
+        return "Contact does not exist"
+
+    def add_transactions_bulk(self, from_user_id, items):
+        """
+        Add many transactions for one sender in a single database transaction.
+        Each item is a dict with type/amount/date and optional to_user_id,
+        description, contact_id (same rules as add_transaction). Invalid items are
+        skipped and reported in data["errors"] as {"index", "error"}.
+        """
+        if not self._user_exists(from_user_id):
+            return self.dict_response(False, "Sender user does not exist")
+
+        # Per-batch memo of the auxiliary lookups, so each user/contact is checked once.
+        users_ok = {from_user_id: True}
+        contacts_ok, counterparties = {}, {}
+        rows, errors = [], []
+        for idx, item in enumerate(items or []):
+            type_, amount, date = item.get("type"), item.get("amount"), item.get("date")
+            to_user_id, contact_id = item.get("to_user_id"), item.get("contact_id")
+            err = validate_transaction(type_, amount, date)
+            if not err and contact_id:
+                if contact_id not in contacts_ok:
+                    contacts_ok[contact_id] = bool(
+                        self.contacts_manager and self.contacts_manager.contact_exists(contact_id, from_user_id)
+                    )
+                if not contacts_ok[contact_id]:
+                    err = "Contact does not exist"
+            if not err and to_user_id is None:
+                if not contact_id:
+                    err = "Recipient not specified (select a Contact)"
+                else:
+                    if contact_id not in counterparties:
+                        counterparties[contact_id] = self._ensure_counterparty_user(contact_id)
+                    to_user_id = counterparties[contact_id]
+                    users_ok[to_user_id] = True
+            if not err:
+                if to_user_id not in users_ok:
+                    users_ok[to_user_id] = self._user_exists(to_user_id)
+                if not users_ok[to_user_id]:
+                    err = "Receiver user does not exist"
+                elif from_user_id == to_user_id:
+                    err = "Sender and receiver must be different"
+            if err:
+                errors.append({"index": idx, "error": err})
+                continue
+            rows.append((from_user_id, to_user_id, type_, float(amount), date, item.get("description", ""), contact_id))
+
+        try:
+            if rows:
+                with get_managed_connection(self.db_path, self._db_manager) as conn:
+                    conn.executemany(
+                        "INSERT INTO transactions (from_user_id, to_user_id, type, amount, date, description, contact_id) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    conn.commit()
+            logger.info(f"Bulk added {len(rows)} transactions for user id={from_user_id} ({len(errors)} rejected)")
+            return self.dict_response(True, data={"inserted": len(rows), "errors": errors})
+        except Exception as e:
+            logger.error(f"Error adding transactions in bulk: {e}")
+            return self.dict_response(False, str(e))
+
     def update_transaction(self, transaction_id, user_id, type_=None, amount=None, date=None, description=None, contact_id=None):
         fields = {}
         if type_ is not None:
@@ -115,9 +212,7 @@ class TransactionsManager:
                 return self.dict_response(False, "Amount must be positive")
             fields["amount"] = val
         if date is not None:
-            try:
-                datetime.strptime(date, "%Y-%m-%d")
-            except Exception:
+            if not is_valid_date(date):
                 return self.dict_response(False, "Invalid date format (YYYY-MM-DD required)")
             fields["date"] = date
         if description is not None:
@@ -131,12 +226,10 @@ class TransactionsManager:
             return self.dict_response(False, "No fields to update")
 
         try:
-            with get_connection(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
-                set_frag = ", ".join(f"{k} = ?" for k in fields.keys())
-                params = list(fields.values()) + [transaction_id, user_id]
-                cursor.execute(f"UPDATE transactions SET {set_frag} WHERE id = ? AND from_user_id = ?", tuple(params))
+                params = (*fields.values(), transaction_id, user_id)
+                cursor.execute(_update_sql(tuple(fields)), params)
                 updated = cursor.rowcount or 0
                 conn.commit()
             return self.dict_response(True, data={"updated": updated})
@@ -146,8 +239,7 @@ class TransactionsManager:
 
     def delete_transaction(self, transaction_id, user_id):
         try:
-            with get_connection(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM transactions WHERE id = ? AND from_user_id = ?", (transaction_id, user_id))
                 deleted = cursor.rowcount or 0
@@ -160,63 +252,94 @@ class TransactionsManager:
 
     def get_transactions(self, user_id, as_sender=True, is_admin=False, order="date_desc", limit=None, offset=None, date_from=None, date_to=None, contact_id=None):
         try:
-            with get_connection(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                params, where_parts = [], []
-                if is_admin:
-                    if not self._is_admin(user_id):
-                        return self.dict_response(False, "Admin privileges required")
-                else:
-                    if as_sender:
-                        where_parts.append("from_user_id = ?")
-                        params.append(user_id)
-                    else:
-                        where_parts.append("to_user_id = ?")
-                        params.append(user_id)
-                if contact_id:
-                    where_parts.append("contact_id = ?")
-                    params.append(contact_id)
-                if date_from:
-                    where_parts.append("date >= ?")
-                    params.append(date_from)
-                if date_to:
-                    where_parts.append("date <= ?")
-                    params.append(date_to)
-
-                where_sql = (" WHERE " + " AND ".join(where_parts)) if where_parts else ""
-                sql = f"SELECT id, from_user_id, to_user_id, type, amount, date, description, contact_id FROM transactions{where_sql} {_order_clause(order)}"
-                if limit is not None:
-                    sql += " LIMIT ?"
-                    params.append(int(limit))
-                    if offset is not None:
-                        sql += " OFFSET ?"
-                        params.append(int(offset))
-                cursor.execute(sql, tuple(params))
-                rows = cursor.fetchall()
-
-            transactions = [{k: r[k] for k in r.keys()} for r in rows]
+            sql, params = self._transactions_query(user_id, as_sender, is_admin, order, date_from, date_to, contact_id)
+            if limit is not None:
+                sql += " LIMIT ?"
+                params += (int(limit),)
+                if offset is not None:
+                    sql += " OFFSET ?"
+                    params += (int(offset),)
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
+                conn.row_factory = None
+                rows = conn.execute(sql, params).fetchall()
+            # The admin role is checked inside the query; only an empty result needs
+            # the separate lookup, to tell "no rows" from "not an admin".
+            if is_admin and not rows and not self._is_admin(user_id):
+                return self.dict_response(False, "Admin privileges required")
+            transactions = [dict(zip(_TX_KEYS, r)) for r in rows]
             return self.dict_response(True, data=transactions)
         except Exception as e:
             logger.error(f"Error retrieving transactions: {e}")
             return self.dict_response(False, str(e))
 
+    def iter_transactions(self, user_id, as_sender=True, is_admin=False, order="date_desc", limit=None, offset=None, date_from=None, date_to=None, contact_id=None, batch_size=1024):
+        """
+        Same filters as get_transactions, but returns an iterator of dicts that reads
+        batch_size rows per query (LIMIT/OFFSET pages), so large histories are never
+        fully in memory. No connection or statement stays open between batches, so
+        writes may run while iterating; rows written meanwhile can shift later pages.
+        Raises PermissionError immediately if is_admin is requested by a non-admin user.
+        """
+        if is_admin and not self._is_admin(user_id):
+            raise PermissionError("Admin privileges required")
+        sql, params = self._transactions_query(user_id, as_sender, is_admin, order, date_from, date_to, contact_id)
+        start = int(offset or 0) if limit is not None else 0
+        remaining = int(limit) if limit is not None else None
+        return self._iter_pages(sql, params, start, remaining, max(1, int(batch_size)))
+
+    @staticmethod
+    def _transactions_query(user_id, as_sender, is_admin, order, date_from, date_to, contact_id):
+        params, where_parts = [], []
+        if is_admin:
+            where_parts.append("EXISTS (SELECT 1 FROM users WHERE id = ? AND role = 'admin')")
+            params.append(user_id)
+        else:
+            if as_sender:
+                where_parts.append("from_user_id = ?")
+            else:
+                where_parts.append("to_user_id = ?")
+            params.append(user_id)
+        if contact_id:
+            where_parts.append("contact_id = ?")
+            params.append(contact_id)
+        if date_from:
+            where_parts.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            where_parts.append("date <= ?")
+            params.append(date_to)
+
+        where_sql = (" WHERE " + " AND ".join(where_parts)) if where_parts else ""
+        return f"{_TX_SELECT}{where_sql} {_order_clause(order)}", tuple(params)
+
+    def _iter_pages(self, sql, params, start, remaining, batch_size):
+        page_sql = sql + " LIMIT ? OFFSET ?"
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            # Each page is read completely and the lease returned before yielding.
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
+                conn.row_factory = None
+                rows = conn.execute(page_sql, params + (size, start)).fetchall()
+            for r in rows:
+                yield dict(zip(_TX_KEYS, r))
+            if len(rows) < size:
+                break
+            start += len(rows)
+            if remaining is not None:
+                remaining -= len(rows)
+
     # ---------------------
     # BALANCE / ANALYTICS
     # ---------------------
     def get_user_balance(self, user_id):
         try:
-            with get_connection(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT type, SUM(amount) as total FROM transactions WHERE from_user_id = ? OR to_user_id = ? GROUP BY type",
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
+                conn.row_factory = None
+                balance = conn.execute(
+                    "SELECT COALESCE(SUM(CASE type WHEN 'credit' THEN amount WHEN 'debit' THEN -amount ELSE 0 END), 0) "
+                    "FROM transactions WHERE from_user_id = ? OR to_user_id = ?",
                     (user_id, user_id)
-                )
-                rows = cursor.fetchall()
-            total_credit = sum(r["total"] for r in rows if r["type"] == "credit")
-            total_debit = sum(r["total"] for r in rows if r["type"] == "debit")
-            balance = total_credit - total_debit
+                ).fetchone()[0]
             logger.info(f"Calculated balance for user ID={user_id}: legacy_balance={balance}")
             return self.dict_response(True, data=balance)
         except Exception as e:
@@ -225,7 +348,7 @@ class TransactionsManager:
 
     def get_user_net_balance(self, user_id):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute(
@@ -234,8 +357,9 @@ class TransactionsManager:
                         COALESCE(SUM(CASE WHEN to_user_id = ? AND type='credit' THEN amount ELSE 0 END),0) AS credits_received,
                         COALESCE(SUM(CASE WHEN from_user_id = ? AND type='debit' THEN amount ELSE 0 END),0) AS debits_sent
                     FROM transactions
+                    WHERE from_user_id = ? OR to_user_id = ?
                     """,
-                    (user_id, user_id)
+                    (user_id, user_id, user_id, user_id)
                 )
                 row = cursor.fetchone()
             net = row["credits_received"] - row["debits_sent"]
@@ -247,7 +371,7 @@ class TransactionsManager:
 
     def get_user_balance_breakdown(self, user_id):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute(
@@ -258,8 +382,9 @@ class TransactionsManager:
                         COALESCE(SUM(CASE WHEN from_user_id = ? AND type='credit' THEN amount ELSE 0 END),0) AS credits_sent,
                         COALESCE(SUM(CASE WHEN to_user_id = ? AND type='debit' THEN amount ELSE 0 END),0) AS debits_received
                     FROM transactions
+                    WHERE from_user_id = ? OR to_user_id = ?
                     """,
-                    (user_id, user_id, user_id, user_id)
+                    (user_id, user_id, user_id, user_id, user_id, user_id)
                 )
                 row = cursor.fetchone()
             net = row["credits_received"] - row["debits_sent"]
@@ -280,7 +405,7 @@ class TransactionsManager:
 
     def get_contact_balance(self, user_id, contact_id):
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute(
@@ -305,24 +430,43 @@ class TransactionsManager:
     # HELPERS
     # ---------------------
     def _user_exists(self, user_id):
+        # Users are never deleted, so a positive hit stays valid; misses are not cached.
+        known = self._known_user_ids
+        if user_id in known:
+            known.move_to_end(user_id)
+            return True
         try:
-            with get_connection(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute("SELECT 1 FROM users WHERE id=?", (user_id,))
-                return cursor.fetchone() is not None
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
+                conn.row_factory = None
+                row = conn.execute("SELECT 1 FROM users WHERE id=?", (user_id,)).fetchone()
         except Exception as e:
             logger.error(f"Error checking user existence: {e}")
             return False
+        if row is None:
+            return False
+        self._remember_user(user_id)
+        return True
+
+    def _remember_user(self, user_id):
+        known = self._known_user_ids
+        known[user_id] = None
+        if len(known) > _USER_CACHE_SIZE:
+            known.popitem(last=False)
+
+    def invalidate_user(self, user_id=None):
+        """Forget cached lookups for user_id (or for every user when None)."""
+        if user_id is None:
+            self._known_user_ids.clear()
+        else:
+            self._known_user_ids.pop(user_id, None)
 
     def _is_admin(self, user_id):
+        # Authorization check: always read the current role, never a cached one.
         try:
-            with get_connection(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute("SELECT role FROM users WHERE id=?", (user_id,))
-                row = cursor.fetchone()
-                return bool(row and row["role"] == "admin")
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
+                conn.row_factory = None
+                row = conn.execute("SELECT role FROM users WHERE id=?", (user_id,)).fetchone()
+            return bool(row and row[0] == "admin")
         except Exception as e:
             logger.error(f"Error checking admin role: {e}")
             return False
@@ -334,17 +478,18 @@ class TransactionsManager:
         Returns the user's id (creates it if needed).
         """
         uname = f"contact_{int(contact_id)}"
-        with get_connection(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-            row = cur.execute("SELECT id FROM users WHERE username = ?", (uname,)).fetchone()
+        with get_managed_connection(self.db_path, self._db_manager) as conn:
+            conn.row_factory = None
+            row = conn.execute("SELECT id FROM users WHERE username = ?", (uname,)).fetchone()
             if row:
-                return int(row["id"])
-            # Create a minimal user row for the counterparty
-            cur.execute(
-                "INSERT INTO users (username, password_hash, role) VALUES (?, ?, 'user')",
-                (uname, "",)
-            )
-            conn.commit()
-            new_id = int(cur.execute("SELECT last_insert_rowid()").fetchone()[0])
-            return new_id
\ No newline at end of file
+                uid = int(row[0])
+            else:
+                # Create a minimal user row for the counterparty; lastrowid avoids a second query.
+                cur = conn.execute(
+                    "INSERT INTO users (username, password_hash, role) VALUES (?, ?, 'user')",
+                    (uname, "",)
+                )
+                uid = int(cur.lastrowid)
+                conn.commit()
+        self._remember_user(uid)
+        return uid
@@ -14,9 +14,8 @@ All methods return dict envelopes compatible with the MoneyMate API and GUI.
 """
 
 from typing import Any, Dict, Optional
-from .database import get_connection
+from .database import get_managed_connection
 from werkzeug.security import generate_password_hash, check_password_hash
-from .database import get_connection
 from .manager import DatabaseManager
 
 from .logging_config import get_logger
@@ -42,7 +41,7 @@ class UserManager:
         Silently ignore errors to avoid impacting auth flows.
         """
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cur = conn.cursor()
                 cur.execute("SELECT name FROM sqlite_schema WHERE type='table' AND name='access_logs';")
                 if cur.fetchone() is None:
@@ -75,7 +74,7 @@ class UserManager:
             return self.dict_response(False, "Admin password must be '12345'")
         password_hash = generate_password_hash(password_norm)
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
@@ -104,7 +103,7 @@ class UserManager:
             logger.warning("Username and password are required for authentication.")
             return self.dict_response(False, "Username and password are required")
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT id, password_hash, role FROM users WHERE username = ?", (username_norm,))
                 row = cursor.fetchone()
@@ -133,7 +132,7 @@ class UserManager:
             logger.warning("New password is required for password change.")
             return self.dict_response(False, "New password is required")
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT password_hash FROM users WHERE id = ?", (user_id,))
                 row = cursor.fetchone()
@@ -156,7 +155,7 @@ class UserManager:
             logger.warning("New password required for password reset.")
             return self.dict_response(False, "New password is required")
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT role FROM users WHERE id = ?", (admin_user_id,))
                 admin_row = cursor.fetchone()
@@ -175,7 +174,7 @@ class UserManager:
 
     def get_user_role(self, user_id: int) -> Dict[str, Any]:
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT role FROM users WHERE id = ?", (user_id,))
                 row = cursor.fetchone()
@@ -192,7 +191,7 @@ class UserManager:
             logger.warning(f"Attempted to set invalid role '{new_role}' for user_id {target_user_id}")
             return self.dict_response(False, f"Role must be one of {allowed_roles}")
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT role FROM users WHERE id = ?", (admin_user_id,))
                 admin_row = cursor.fetchone()
@@ -201,6 +200,8 @@ class UserManager:
                     return self.dict_response(False, "Admin privileges required")
                 cursor.execute("UPDATE users SET role = ? WHERE id = ?", (new_role, target_user_id))
                 conn.commit()
+            if self._db_manager is not None:
+                self._db_manager.invalidate_user(target_user_id)
             logger.info(f"Role for user_id {target_user_id} set to '{new_role}' by admin {admin_user_id}")
             return self.dict_response(True)
         except Exception as e:
@@ -218,7 +219,7 @@ class UserManager:
         if not username_norm:
             return self.dict_response(False, "Username is required")
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT id, username, role FROM users WHERE username = ?", (username_norm,))
                 row = cursor.fetchone()
@@ -235,7 +236,7 @@ class UserManager:
         Envelope: {success, error, data: [ {id, username, role}, ... ]}
         """
         try:
-            with get_connection(self.db_path) as conn:
+            with get_managed_connection(self.db_path, self._db_manager) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT id, username, role FROM users ORDER BY id ASC")
                 rows = cursor.fetchall()
@@ -243,4 +244,4 @@ class UserManager:
             return self.dict_response(True, data=data)
         except Exception as e:
             logger.error(f"Error listing users: {e}")
-            return self.dict_response(False, str(e))
\ No newline at end of file
+            return self.dict_response(False, str(e))
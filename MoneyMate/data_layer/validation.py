@@ -19,6 +19,29 @@ from .database import get_connection
 
 # --- VALIDATION METHODS ---
 
+def is_valid_date(date: Any) -> bool:
+    """
+    True if date is a real calendar date accepted by strptime(date, "%Y-%m-%d").
+    The canonical zero-padded form is checked by slicing, without strptime's
+    format parsing; any other string falls back to strptime.
+    """
+    if not isinstance(date, str):
+        return False
+    if len(date) == 10 and date[4] == "-" and date[7] == "-" and date.isascii():
+        y, m, d = date[:4], date[5:7], date[8:]
+        if y.isdigit() and m.isdigit() and d.isdigit():
+            try:
+                datetime(int(y), int(m), int(d))
+                return True
+            except ValueError:
+                return False
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
 def validate_expense(title: Optional[str], price: Any, date: Optional[str], category: Optional[str]) -> Optional[str]:
     """
     Validate expense fields: title, price, date, category.
@@ -51,9 +74,7 @@ def validate_expense(title: Optional[str], price: Any, date: Optional[str], cate
         return "Price must be positive"
 
     # Date format
-    try:
-        datetime.strptime(date, "%Y-%m-%d")
-    except Exception:
+    if not is_valid_date(date):
         return "Invalid date format (YYYY-MM-DD required)"
 
     return None
@@ -97,9 +118,7 @@ def validate_transaction(type_: Optional[str], amount: Any, date: Optional[str])
         return "Amount must be positive"
 
     # Date format
-    try:
-        datetime.strptime(date, "%Y-%m-%d")
-    except Exception:
+    if not is_valid_date(date):
         return "Invalid date format (YYYY-MM-DD required)"
 
-    return None
\ No newline at end of file
+    return None
@@ -75,4 +75,96 @@ def test_expenses_table_has_category_id():
     cursor.execute("PRAGMA table_info(expenses)")
     columns = [row[1] for row in cursor.fetchall()]
     assert "category_id" in columns
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+
+def test_get_connection_context_manager_keeps_stdlib_semantics():
+    """Test that a get_connection() with-block only ends the transaction, while the internal helper also closes."""
+    import sqlite3
+    from MoneyMate.data_layer.database import _closing_connection
+    with get_connection(TEST_DB) as conn:
+        conn.execute("SELECT 1")
+    assert conn.execute("SELECT 1").fetchone()[0] == 1
+    conn.close()
+    with _closing_connection(TEST_DB) as conn:
+        conn.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+def test_init_db_enables_wal():
+    """Test that init_db switches file databases to WAL journaling."""
+    conn = get_connection(TEST_DB)
+    mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.close()
+    assert mode.lower() == "wal"
+
+def test_init_db_stamps_user_version_and_short_circuits():
+    """Test that init_db stamps PRAGMA user_version and is a no-op on an initialized DB."""
+    from MoneyMate.data_layer.database import SCHEMA_VERSION
+    conn = get_connection(TEST_DB)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.close()
+    res = init_db(TEST_DB)
+    assert res["success"] is True
+
+def test_lookup_indexes_exist():
+    """Test that init_db creates the indexes used by contact balance and access log lookups."""
+    conn = get_connection(TEST_DB)
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_schema WHERE type='index'")}
+    conn.close()
+    assert {"idx_transactions_contact_id", "idx_transactions_from_user_contact",
+            "idx_access_logs_user_created"} <= names
+
+def test_get_connection_applies_connection_pragmas():
+    """Test that get_connection sets NORMAL sync and a busy timeout on each connection."""
+    with get_connection(TEST_DB) as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+def test_get_transactions_orderings_avoid_temp_sort():
+    """Test that the listing queries of get_transactions are served by an index without a sort step."""
+    conn = get_connection(TEST_DB)
+    cols = "SELECT id, from_user_id, to_user_id, type, amount, date, description, contact_id FROM transactions"
+    queries = [
+        "WHERE from_user_id = ? AND contact_id = ? ORDER BY date DESC, id DESC",
+        "WHERE from_user_id = ? ORDER BY created_at DESC, id DESC",
+        "WHERE to_user_id = ? ORDER BY created_at ASC, id ASC",
+    ]
+    for where in queries:
+        plan = " ".join(r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {cols} {where}", (1,) * where.count("?")))
+        assert "USING INDEX" in plan and "TEMP B-TREE" not in plan, plan
+    conn.close()
+
+def test_migration_from_v3_rebuilds_contact_index():
+    """Test that a v3 database gets the widened (from_user_id, contact_id, date) index."""
+    conn = get_connection(TEST_DB)
+    conn.executescript(
+        "DROP INDEX idx_transactions_from_user_contact;"
+        "CREATE INDEX idx_transactions_from_user_contact ON transactions(from_user_id, contact_id);"
+        "UPDATE schema_version SET version = 3; PRAGMA user_version = 3;"
+    )
+    conn.close()
+    assert init_db(TEST_DB)["success"] is True
+    conn = get_connection(TEST_DB)
+    cols = [r[2] for r in conn.execute("PRAGMA index_info('idx_transactions_from_user_contact')")]
+    conn.close()
+    assert cols == ["from_user_id", "contact_id", "date"]
+
+def test_failed_migration_leaves_user_version_unstamped(tmp_path):
+    """Test that init_db does not stamp user_version when a column migration fails."""
+    import sqlite3
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    # Upper-case IS_ACTIVE is missed by the column check, so the ALTER fails as a duplicate.
+    conn.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL UNIQUE, "
+        "password_hash TEXT NOT NULL, role TEXT NOT NULL DEFAULT 'user', "
+        "IS_ACTIVE INTEGER NOT NULL DEFAULT 1, created_at TEXT)"
+    )
+    conn.close()
+    assert init_db(path)["success"] is True
+    conn = sqlite3.connect(path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    assert version == 0
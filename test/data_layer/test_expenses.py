@@ -279,4 +279,20 @@ def test_search_expenses_with_date_range(db):
     )
     assert res["success"]
     titles = {e["title"] for e in res["data"]}
-    assert titles == {"Feb"}
\ No newline at end of file
+    assert titles == {"Feb"}
+
+def test_add_expenses_bulk_on_manager(db):
+    """
+    ExpensesManager.add_expenses_bulk inserts the valid items in one batch and
+    reports the invalid ones by index.
+    """
+    res = db.expenses.add_expenses_bulk([
+        {"title": "Bus", "price": 2.0, "date": "2025-01-10", "category": "Transport"},
+        {"title": "Bad", "price": -1, "date": "2025-01-10", "category": "Transport"},
+        {"title": "Train", "price": 9.0, "date": "2025-01-11", "category": "Transport"},
+    ], db._test_user_id)
+    assert res["success"]
+    assert res["data"]["inserted"] == 2
+    assert [e["index"] for e in res["data"]["errors"]] == [1]
+    titles = {e["title"] for e in db.expenses.get_expenses(db._test_user_id)["data"]}
+    assert titles == {"Bus", "Train"}
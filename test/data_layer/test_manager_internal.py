@@ -7,6 +7,7 @@ These tests increase coverage of manager.py without changing external behavior.
 
 import os
 import gc
+import sqlite3
 import pytest
 
 from MoneyMate.data_layer.manager import DatabaseManager
@@ -162,4 +163,336 @@ def test_clear_expenses_and_get_transactions_legacy(db):
     assert bal["success"]
     # get_contact_balance returns net as float in data
     assert isinstance(bal["data"], float)
-    assert bal["data"] == 20.0
\ No newline at end of file
+    assert bal["data"] == 20.0
+
+
+def test_counterparty_user_is_cached_and_reset_on_close(db):
+    """
+    _ensure_counterparty_user should memoize contact_id -> user_id and
+    close() should drop both the counterparty and default-user caches.
+    """
+    assert db.add_contact("Cached")["success"]
+    cid = db.get_contacts()["data"][0]["id"]
+
+    uid = db._ensure_counterparty_user(cid)
+    assert db._counterparty_cache == {cid: uid}
+    assert db._ensure_counterparty_user(cid) == uid
+    assert db._default_user_id is not None
+
+    db.close()
+    assert db._counterparty_cache == {}
+    assert db._default_user_id is None
+
+
+def test_known_contact_ids_cache_invalidated_on_delete(db):
+    """
+    _contact_exists caches positive lookups; delete_contact must drop them so a
+    removed contact is reported as missing again.
+    """
+    assert db.add_contact("Temp")["success"]
+    cid = db.get_contacts()["data"][0]["id"]
+
+    assert db._contact_exists(cid)
+    assert cid in db._known_contact_ids
+    assert not db._contact_exists(cid + 1000)
+    assert cid + 1000 not in db._known_contact_ids
+
+    assert db.delete_contact(cid)["success"]
+    assert db._known_contact_ids == set()
+    assert not db._contact_exists(cid)
+
+
+def test_ops_connection_applies_performance_pragmas(db):
+    """
+    Helper connections opened by _connect_for_ops should carry the tuned PRAGMAs
+    (WAL for file databases, foreign keys enforced, busy timeout set).
+    """
+    conn, close_after = db._connect_for_ops()
+    try:
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0].lower() == "wal"
+        assert conn.execute("PRAGMA foreign_keys;").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout;").fetchone()[0] == 5000
+    finally:
+        if close_after:
+            conn.close()
+
+
+def test_ops_connection_is_reused_until_close(db):
+    """
+    File-backed databases keep one long-lived helper connection per thread,
+    all released by close().
+    """
+    import threading
+
+    first, close_first = db._connect_for_ops()
+    second, close_second = db._connect_for_ops()
+    assert first is second
+    assert not close_first and not close_second
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(db._connect_for_ops()[0]))
+    worker.start()
+    worker.join()
+    assert other[0] is not first
+    assert len(db._ops_conns) == 2
+
+    db.close()
+    assert db._ops_conns == {}
+
+
+def test_bulk_inserts_commit_valid_rows_and_report_errors(db):
+    """
+    add_expenses_bulk / add_transactions_bulk insert valid rows in one batch
+    and report rejected rows by index with localized errors.
+    """
+    res = db.add_expenses_bulk([
+        {"title": "A", "price": 5, "date": "2025-08-19", "category": "Food"},
+        {"title": "", "price": 5, "date": "2025-08-19", "category": "Food"},
+        {"title": "B", "price": 7.5, "date": "2025-08-20", "category": "Travel"},
+    ])
+    assert res["success"]
+    assert res["data"]["inserted"] == 2
+    assert [e["index"] for e in res["data"]["errors"]] == [1]
+    assert "titolo" in res["data"]["errors"][0]["error"].lower()
+    assert len(db.get_expenses()["data"]) == 2
+
+    assert db.add_contact("Bulk")["success"]
+    cid = db.get_contacts()["data"][0]["id"]
+    res_tx = db.add_transactions_bulk([
+        {"contact_id": cid, "type": "credit", "amount": 10, "date": "2025-08-19", "note": "x"},
+        {"contact_id": cid, "type": "DEBIT", "amount": 4, "date": "2025-08-19"},
+        {"contact_id": cid, "type": "loan", "amount": 4, "date": "2025-08-19"},
+    ])
+    assert res_tx["success"]
+    assert res_tx["data"]["inserted"] == 2
+    assert [e["index"] for e in res_tx["data"]["errors"]] == [2]
+    assert db.get_contact_balance(cid)["data"] == 6.0
+
+
+def test_localize_error_msg_field_priority(db):
+    """
+    _localize_error_msg appends the first applicable Italian field label and
+    leaves already-localized or unrelated messages untouched.
+    """
+    assert db._localize_error_msg("Invalid date format") == "Invalid date format (campo: data)"
+    assert db._localize_error_msg("Contact does not exist") == "Contact does not exist (campo: contatto)"
+    assert db._localize_error_msg("Missing title (campo: titolo)") == "Missing title (campo: titolo)"
+    assert db._localize_error_msg("Sender user does not exist") == "Sender user does not exist"
+
+
+def test_set_db_path_same_path_is_noop(db):
+    """
+    Re-setting the current db_path keeps managers and caches; after close()
+    the same path re-initializes the managers.
+    """
+    expenses_mgr = db.expenses
+    uid = db._ensure_default_user()
+    db.set_db_path(TEST_DB)
+    assert db.expenses is expenses_mgr
+    assert db._default_user_id == uid
+
+    db.close()
+    db.set_db_path(TEST_DB)
+    assert db.expenses is not None
+    assert db.add_expense("After", 3, "2025-08-19", "Food")["success"]
+
+
+def test_close_manager_closes_held_connections(db):
+    """
+    _close_manager closes connections stored under well-known or arbitrary attributes.
+    """
+    import sqlite3
+
+    class Holder:
+        pass
+
+    known, other = Holder(), Holder()
+    known._conn = sqlite3.connect(":memory:")
+    other.custom_handle = sqlite3.connect(":memory:")
+    conns = (known._conn, other.custom_handle)
+
+    db._close_manager(known)
+    db._close_manager(other)
+
+    assert known._conn is None
+    assert other.custom_handle is None
+    for conn in conns:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_validate_expense_date_value_and_format(db):
+    """
+    _validate_expense distinguishes malformed dates from impossible calendar dates.
+    """
+    assert db._validate_expense("E", 1, "2025-02-28") is None
+    assert "value" in db._validate_expense("E", 1, "2025-02-30")
+    assert "format" in db._validate_expense("E", 1, "2025-02-28\n")
+    assert "format" in db._validate_expense("E", 1, "2025/02/28")
+
+
+def test_maybe_optimize_runs_only_after_interval(db, monkeypatch):
+    """
+    maybe_optimize is a no-op until the optimize interval has elapsed.
+    """
+    from MoneyMate.data_layer import manager as manager_module
+
+    last = db._last_optimize
+    db.maybe_optimize()
+    assert db._last_optimize == last
+
+    monkeypatch.setattr(manager_module, "_OPTIMIZE_INTERVAL", -1.0)
+    db.maybe_optimize()
+    assert db._last_optimize > last
+
+
+def test_sub_managers_share_pooled_connections(db):
+    """
+    Sub-manager calls borrow connections from the manager pool and return them
+    open; close() drains and closes the pool.
+    """
+    import sqlite3
+
+    db.add_expense("Pooled", 1.0, "2025-01-01", "Food")
+    db.get_expenses()
+    pool = db._pool
+    assert pool is not None
+    idle = pool.acquire()
+    assert idle.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    pool.release(idle)
+
+    db.close()
+    assert db._pool is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        idle.execute("SELECT 1")
+
+
+def test_sub_managers_are_built_lazily(db):
+    """
+    Sub-managers are created on first access, set to None by close() and
+    rebuilt after set_db_path().
+    """
+    assert "categories" not in db.__dict__
+    first = db.categories
+    assert db.categories is first
+
+    db.close()
+    assert db.categories is None
+
+    db.set_db_path(TEST_DB)
+    assert db.categories is not None and db.categories is not first
+
+
+def test_list_tables_is_cached_until_schema_changes(db):
+    """
+    list_tables reads sqlite_schema again only when PRAGMA schema_version moves,
+    including for tables created through another connection; set_db_path resets
+    the cache.
+    """
+    first = db.list_tables()
+    assert db._tables_cache is not None
+
+    conn, _ = db._connect_for_ops()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        assert list(db.list_tables()) == list(first)
+        assert not any("sqlite_schema" in sql for sql in statements)
+    finally:
+        conn.set_trace_callback(None)
+
+    other = sqlite3.connect(TEST_DB)
+    other.execute("CREATE TABLE extra_table (id INTEGER PRIMARY KEY)")
+    other.commit()
+    other.close()
+    assert "extra_table" in db.list_tables()["data"]
+
+    db.set_db_path(TEST_DB + ".other")
+    assert db._tables_cache is None
+    db.close()
+    os.remove(TEST_DB + ".other")
+
+
+def test_plain_memory_path_shares_one_database():
+    """
+    ":memory:" is mapped to a private shared-cache URI held open by the keeper,
+    so data written through one manager call is visible to the next; db_path
+    still reports the path the caller passed.
+    """
+    mem = DatabaseManager(":memory:")
+    try:
+        assert mem.db_path == ":memory:"
+        assert mem._keeper is not None
+        assert mem.add_expense("Mem", 2.5, "2025-01-01", "Food")["success"]
+        titles = [e["title"] for e in mem.get_expenses()["data"]]
+        assert titles == ["Mem"]
+        other = DatabaseManager(":memory:")
+        try:
+            assert other._db_uri != mem._db_uri
+            assert other.get_expenses()["data"] == []
+        finally:
+            other.close()
+    finally:
+        mem.close()
+
+
+def test_user_scoped_delegates_accept_keyword_arguments(db):
+    """
+    The generated facade delegates accept their leading arguments by name,
+    pass other keywords through and raise TypeError when one is missing.
+    """
+    assert db.add_expense("Taxi ride", 12.0, "2025-08-19", "Transport")["success"]
+    assert db.add_expense("Lunch", 8.0, "2025-08-20", "Food")["success"]
+    assert [e["title"] for e in db.search_expenses(query="Taxi")["data"]] == ["Taxi ride"]
+    titles = [e["title"] for e in db.get_expenses(order="date_asc")["data"]]
+    assert titles == ["Taxi ride", "Lunch"]
+
+    eid = db.get_expenses()["data"][0]["id"]
+    assert db.delete_expense(expense_id=eid)["success"]
+    assert len(db.get_expenses()["data"]) == 1
+
+    assert db.add_contact("KwContact")["success"]
+    cid = db.get_contacts()["data"][0]["id"]
+    assert db.add_transaction(cid, "credit", 20, "2025-08-19", "Loan")["success"]
+    tid = db.get_transactions(cid)["data"][0]["id"]
+    assert db.delete_transaction(transaction_id=tid)["success"]
+    assert db.get_transactions(cid)["data"] == []
+
+    with pytest.raises(TypeError):
+        db.delete_expense()
+    with pytest.raises(TypeError):
+        db.search_expenses(user_id=db.default_user_id)
+
+
+def test_bulk_transactions_reject_contacts_of_other_users(db):
+    """
+    add_transactions_bulk goes through TransactionsManager, so a contact owned
+    by another user is rejected and reported at its index in the input rows.
+    """
+    assert db.add_contact("Mine")["success"]
+    own_cid = db.get_contacts()["data"][0]["id"]
+    other = db.users.register_user("bulk_other", "pw")["data"]["user_id"]
+    assert db.add_contact("Theirs", user_id=other)["success"]
+    foreign_cid = db.get_contacts(user_id=other)["data"][0]["id"]
+
+    res = db.add_transactions_bulk([
+        {"contact_id": own_cid, "type": "credit", "amount": 10, "date": "2025-08-19"},
+        {"contact_id": own_cid, "type": "loan", "amount": 4, "date": "2025-08-19"},
+        {"contact_id": foreign_cid, "type": "debit", "amount": 3, "date": "2025-08-19"},
+    ])
+    assert res["success"]
+    assert res["data"]["inserted"] == 1
+    assert [e["index"] for e in res["data"]["errors"]] == [1, 2]
+    assert db.get_contact_balance(own_cid)["data"] == 10.0
+
+
+def test_close_does_not_recreate_deleted_db_file(tmp_path):
+    """
+    close() (and so __del__) must not open a new connection: a deleted DB file
+    must stay deleted.
+    """
+    path = str(tmp_path / "gone.db")
+    dbm = DatabaseManager(path)
+    os.remove(path)
+    dbm.close()
+    assert not os.path.exists(path)
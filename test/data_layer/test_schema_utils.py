@@ -1,11 +1,14 @@
 import os
+import pytest
 import sqlite3
 from pathlib import Path
 
 from MoneyMate.data_layer.schema_utils import (
+    REQUIRED_USER_COLUMNS,
     ensure_auth_schema,
     _table_exists,
     _table_columns,
+    _table_has_columns,
 )
 
 
@@ -95,4 +98,121 @@ def test_ensure_auth_schema_is_idempotent():
         assert tables_before == tables_after
         assert cols_before == cols_after
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+def test_ensure_auth_schema_skips_migrated_db_but_not_recreated_one():
+    """
+    A DB file already migrated in this process is skipped on later calls, unless
+    its auth tables disappeared (e.g. the file was recreated) or force=True.
+    """
+    conn = _new_conn()
+    try:
+        ensure_auth_schema(conn)
+        conn.commit()
+        conn.execute("DROP TABLE sessions")
+        conn.commit()
+        ensure_auth_schema(conn)
+        conn.commit()
+        assert _table_exists(conn, "sessions")
+
+        conn.execute("DROP INDEX IF EXISTS idx_sessions_token")
+        conn.commit()
+        ensure_auth_schema(conn)
+        conn.commit()
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        assert "idx_sessions_token" not in names
+
+        ensure_auth_schema(conn, force=True)
+        conn.commit()
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        assert "idx_sessions_token" in names
+    finally:
+        conn.close()
+
+
+def test_table_has_columns_reads_stored_definition():
+    """
+    _table_has_columns must agree with PRAGMA table_info, including columns added
+    later with ALTER TABLE and names that only appear inside other definitions.
+    """
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("""CREATE TABLE legacy (id INTEGER PRIMARY KEY, "user name" TEXT, role_x TEXT, note TEXT DEFAULT 'role')""")
+        conn.execute("ALTER TABLE legacy ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1")
+        found = _table_has_columns(conn, "legacy", ("id", "user name", "role", "is_active", "created_at"))
+        assert found == {"id": True, "user name": True, "role": False, "is_active": True, "created_at": False}
+        assert _table_has_columns(conn, "missing", ("id",)) == {"id": False}
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize(
+    "users_ddl",
+    [
+        # Columns after comments and a single-quoted identifier: the stored SQL
+        # is hard to read, but the columns exist and must not be re-added.
+        """CREATE TABLE users (
+             id INTEGER PRIMARY KEY, username TEXT UNIQUE, -- legacy
+             /* auth */ password_hash TEXT NOT NULL DEFAULT '', 'role' TEXT NOT NULL DEFAULT 'user',
+             is_active INTEGER NOT NULL DEFAULT 1, created_at TEXT, updated_at TEXT)""",
+        # A DEFAULT literal mentioning ", role " must not hide the missing column.
+        """CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE, note TEXT DEFAULT 'x, role x')""",
+    ],
+)
+def test_ensure_auth_schema_migrates_unusual_users_definitions(users_ddl):
+    """
+    ensure_auth_schema must add exactly the missing users columns, whatever the
+    spelling of the stored CREATE statement.
+    """
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute(users_ddl)
+        ensure_auth_schema(conn)
+        assert REQUIRED_USER_COLUMNS <= _table_columns(conn, "users")
+    finally:
+        conn.close()
+
+
+def test_ensure_auth_schema_migrates_file_recreated_at_same_path(tmp_path):
+    """
+    A DB file deleted and recreated at an already-migrated path with a legacy
+    users table must be migrated again, not skipped.
+    """
+    path = str(tmp_path / "recreated.db")
+    conn = sqlite3.connect(path)
+    ensure_auth_schema(conn)
+    conn.commit()
+    conn.close()
+    os.remove(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE);
+            CREATE TABLE sessions (id INTEGER PRIMARY KEY, user_id INTEGER, session_token TEXT);
+            CREATE TABLE access_logs (id INTEGER PRIMARY KEY, user_id INTEGER, action TEXT);
+            CREATE TABLE schema_version (version INTEGER NOT NULL);
+            INSERT INTO schema_version (version) VALUES (1);
+            """
+        )
+        ensure_auth_schema(conn)
+        conn.commit()
+        assert REQUIRED_USER_COLUMNS <= _table_columns(conn, "users")
+    finally:
+        conn.close()
+
+
+def test_ensure_auth_schema_applies_connection_pragmas():
+    """
+    ensure_auth_schema tunes the caller's connection (busy timeout, NORMAL sync)
+    before running its DDL.
+    """
+    conn = sqlite3.connect(":memory:")
+    try:
+        ensure_auth_schema(conn)
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    finally:
+        conn.close()
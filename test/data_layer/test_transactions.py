@@ -339,4 +339,137 @@ def test_get_transactions_admin_with_filters(db):
     assert res["success"]
     descs = [t["description"] for t in res["data"]]
     assert "Mar" in descs
-    assert "Jan" not in descs
\ No newline at end of file
+    assert "Jan" not in descs
+
+
+def test_add_transactions_bulk_inserts_valid_items(db):
+    """Test bulk insert commits valid items in one go and reports invalid ones by index."""
+    items = [
+        {"to_user_id": db._to_user_id, "type": "debit", "amount": 10, "date": "2025-08-19"},
+        {"to_user_id": db._to_user_id, "type": "loan", "amount": 10, "date": "2025-08-19"},
+        {"to_user_id": db._from_user_id, "type": "credit", "amount": 5, "date": "2025-08-20"},
+        {"to_user_id": db._to_user_id, "type": "credit", "amount": 7.5, "date": "2025-08-21", "description": "Back"},
+    ]
+    res = db.transactions.add_transactions_bulk(db._from_user_id, items)
+    assert res["success"]
+    assert res["data"]["inserted"] == 2
+    assert [e["index"] for e in res["data"]["errors"]] == [1, 2]
+    tr = db.transactions.get_transactions(db._from_user_id)["data"]
+    assert sorted(t["amount"] for t in tr) == [7.5, 10.0]
+
+def test_user_existence_cache_is_bounded_and_roles_are_read_fresh(db, monkeypatch):
+    """Test existence hits are cached in a bounded LRU while admin checks always see the current role."""
+    import MoneyMate.data_layer.transactions as tx_module
+    tm = db.transactions
+    assert tm._user_exists(db._from_user_id)
+    assert db._from_user_id in tm._known_user_ids
+    assert not tm._user_exists(999999)
+    assert 999999 not in tm._known_user_ids
+
+    monkeypatch.setattr(tx_module, "_USER_CACHE_SIZE", 2)
+    for uid in (db._admin_id, db._to_user_id):
+        assert tm._user_exists(uid)
+    assert list(tm._known_user_ids) == [db._admin_id, db._to_user_id]
+
+    assert tm._is_admin(db._admin_id)
+    # Role revoked through another manager instance: no stale admin rights.
+    from MoneyMate.data_layer.usermanager import UserManager
+    other = UserManager(db.db_path)
+    assert other.set_user_role(db._admin_id, db._from_user_id, "admin")["success"]
+    assert other.set_user_role(db._from_user_id, db._admin_id, "user")["success"]
+    assert not tm._is_admin(db._admin_id)
+    assert tm._is_admin(db._from_user_id)
+
+
+def test_ensure_counterparty_user_is_stable(db):
+    """Test the virtual counterparty user is created once and reused for the same contact."""
+    from MoneyMate.data_layer.transactions import TransactionsManager
+    standalone = TransactionsManager(db.db_path)
+    uid = standalone._ensure_counterparty_user(424242)
+    assert standalone._ensure_counterparty_user(424242) == uid
+    assert db.transactions._ensure_counterparty_user(424242) == uid
+    assert db.users.get_user_by_username("contact_424242")["data"]["id"] == uid
+
+def test_get_user_balance_without_transactions_is_zero(db):
+    """Test balance of a user with no transactions is 0."""
+    saldo = db.transactions.get_user_balance(db._to_user_id)
+    assert saldo["success"]
+    assert saldo["data"] == 0
+
+def test_balance_breakdown_ignores_other_users_transactions(db):
+    """Test net/breakdown only aggregate the user's own transactions."""
+    db.transactions.add_transaction(db._from_user_id, db._to_user_id, "debit", 30, "2025-08-19")
+    db.transactions.add_transaction(db._admin_id, db._to_user_id, "credit", 500, "2025-08-19")
+    br = db.transactions.get_user_balance_breakdown(db._from_user_id)["data"]
+    assert br["debits_sent"] == 30 and br["credits_received"] == 0 and br["net"] == -30
+    assert db.transactions.get_user_net_balance(db._from_user_id)["data"] == -30
+    assert db.transactions.get_user_net_balance(db._to_user_id)["data"] == 500
+
+def test_iter_transactions_streams_in_batches(db):
+    """Test iter_transactions yields the same rows as get_transactions, lazily and in order."""
+    for day in range(1, 6):
+        db.transactions.add_transaction(db._from_user_id, db._to_user_id, "debit", day, f"2025-08-0{day}")
+    it = db.transactions.iter_transactions(db._from_user_id, batch_size=2)
+    assert next(it)["date"] == "2025-08-05"
+    rest = list(it)
+    assert [t["amount"] for t in rest] == [4.0, 3.0, 2.0, 1.0]
+    assert db.transactions.get_transactions(db._from_user_id)["data"][1:] == rest
+    with pytest.raises(PermissionError):
+        db.transactions.iter_transactions(db._from_user_id, is_admin=True)
+    paged = db.transactions.iter_transactions(db._from_user_id, limit=3, offset=1, batch_size=2)
+    assert [t["amount"] for t in paged] == [4.0, 3.0, 2.0]
+
+
+def test_write_while_iterating_transactions(tmp_path):
+    """Test writes succeed while an iter_transactions iterator is open, also on :memory:."""
+    from MoneyMate.data_layer.manager import DatabaseManager
+    for path in (":memory:", str(tmp_path / "iter.db")):
+        dbm = DatabaseManager(path)
+        try:
+            a = dbm.users.register_user("iter_a", "pw")["data"]["user_id"]
+            b = dbm.users.register_user("iter_b", "pw")["data"]["user_id"]
+            for day in range(1, 4):
+                assert dbm.transactions.add_transaction(a, b, "debit", day, f"2025-08-0{day}")["success"]
+            it = dbm.transactions.iter_transactions(a, batch_size=1)
+            assert next(it)["amount"] == 3.0
+            res = dbm.transactions.add_transaction(a, b, "credit", 9, "2025-07-01")
+            assert res["success"], res
+            assert [t["amount"] for t in it] == [2.0, 1.0, 9.0]
+        finally:
+            dbm.close()
+
+def test_add_transaction_contact_must_belong_to_sender(db):
+    """Test the contact guard of the single-statement insert, with explicit and auto-resolved recipients."""
+    db.contacts.add_contact("Receiver's friend", db._to_user_id)
+    foreign_cid = db.contacts.get_contacts(db._to_user_id)["data"][0]["id"]
+    db.contacts.add_contact("Mine", db._from_user_id)
+    own_cid = db.contacts.get_contacts(db._from_user_id)["data"][0]["id"]
+
+    res = db.transactions.add_transaction(db._from_user_id, db._to_user_id, "debit", 5, "2025-08-19", contact_id=foreign_cid)
+    assert not res["success"] and res["error"] == "Contact does not exist"
+    res = db.transactions.add_transaction(db._from_user_id, None, "debit", 5, "2025-08-19", contact_id=foreign_cid)
+    assert not res["success"] and res["error"] == "Contact does not exist"
+    res = db.transactions.add_transaction(9999, db._to_user_id, "debit", 5, "2025-08-19", contact_id=foreign_cid)
+    assert res["error"] == "Sender user does not exist"
+    assert db.transactions.get_transactions(db._from_user_id)["data"] == []
+
+    assert db.transactions.add_transaction(db._from_user_id, db._to_user_id, "debit", 5, "2025-08-19", contact_id=own_cid)["success"]
+    assert db.transactions.add_transaction(db._from_user_id, None, "credit", 7, "2025-08-20", contact_id=own_cid)["success"]
+    assert len(db.transactions.get_transactions(db._from_user_id, contact_id=own_cid)["data"]) == 2
+
+def test_admin_listing_checks_role_inside_the_query(db):
+    """Test admin listings run a single statement when rows exist and still reject non-admins."""
+    db.transactions.add_transaction(db._from_user_id, db._to_user_id, "debit", 10, "2025-08-19")
+    statements = []
+    # Trace every connection the pool can hand out.
+    conns = [db._pool.acquire() for _ in range(db._pool.size)]
+    for conn in conns:
+        conn.set_trace_callback(statements.append)
+        db._pool.release(conn)
+    res = db.transactions.get_transactions(db._admin_id, is_admin=True)
+    for conn in conns:
+        conn.set_trace_callback(None)
+    assert res["success"] and len(res["data"]) == 1
+    assert len(statements) == 1 and "role = 'admin'" in statements[0]
+    res = db.transactions.get_transactions(db._from_user_id, is_admin=True)
+    assert not res["success"] and res["error"] == "Admin privileges required"
@@ -13,7 +13,7 @@ Each test asserts that returned error messages mention the relevant field.
 """
 
 import pytest
-from MoneyMate.data_layer.validation import validate_expense, validate_contact, validate_transaction
+from MoneyMate.data_layer.validation import validate_expense, validate_contact, validate_transaction, is_valid_date
 
 # --- validate_expense ---
 
@@ -124,4 +124,22 @@ def test_validate_transaction_invalid_date_format(bad_date):
     """
     error = validate_transaction("debit", 10, bad_date)
     assert error is not None
-    assert "date format" in error.lower()
\ No newline at end of file
+    assert "date format" in error.lower()
+
+# --- is_valid_date ---
+
+@pytest.mark.parametrize(
+    "date", ["2025-08-19", "2024-02-29", "2025-8-1", "2025-08-32", "2025-02-29", "2025/08/19",
+             "19-08-2025", "2025-08-1x", "0000-01-01", "", None, 20250819]
+)
+def test_is_valid_date_matches_strptime(date):
+    """
+    is_valid_date must accept exactly the dates strptime(date, "%Y-%m-%d") accepts.
+    """
+    from datetime import datetime
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+        expected = True
+    except (TypeError, ValueError):
+        expected = False
+    assert is_valid_date(date) is expected